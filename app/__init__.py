@@ -1,12 +1,13 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, flash, redirect, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from config import Config
+from app.routing import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 csrf = CSRFProtect()
@@ -19,12 +20,32 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Time connection-pool checkouts for /metrics (must precede engine creation)
+    from app.metrics import configure_pool_timing
+    configure_pool_timing(app)
+
     # Initialize core extensions
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
 
+    # Per-connection SQLite pragmas (WAL, busy timeout, cache sizes)
+    from app.database import init_sqlite_profile
+    init_sqlite_profile(app)
+
+    # Separate read engine for @read_only views
+    from app.routing import init_read_routing
+    init_read_routing(app)
+
+    # Cache of logged-in user identities for the user_loader
+    from app.identity import init_identity_cache
+    init_identity_cache(app)
+
+    # Versioned cache for complaint list pages
+    from app.cache import init_page_cache
+    init_page_cache(app)
+
     # Register Blueprints
     from app.auth import auth as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -38,6 +59,38 @@ def create_app(config_class=Config):
     from app.staff import staff as staff_bp
     app.register_blueprint(staff_bp, url_prefix='/staff')
 
+    # {% cache %} tag for rendered complaint cards and rows
+    from app.fragments import init_fragment_cache
+    init_fragment_cache(app)
+
+    # Image URLs (thumbnail/web variants) for templates
+    from app.uploads import image_url
+    app.add_template_global(image_url)
+
+    # Cursor links for paginated lists
+    from app.pagination import cursor_url
+    app.add_template_global(cursor_url)
+
+    # Per-view SQL statement budgets (enforced in tests)
+    from app.queries import init_query_budget
+    init_query_budget(app)
+
+    # Opt-in request profiling and slow-query log
+    from app.profiling import init_profiling
+    init_profiling(app)
+
+    # Prometheus metrics at /metrics
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    # Background jobs (auto-escalation)
+    from app.tasks import init_scheduler
+    init_scheduler(app)
+
+    # CLI maintenance commands
+    from app.commands import register_commands
+    register_commands(app)
+
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -47,6 +100,11 @@ def create_app(config_class=Config):
     def forbidden(error):
         return render_template('errors/403.html'), 403
 
+    @app.errorhandler(413)
+    def request_too_large(error):
+        flash('That upload is too large.', 'danger')
+        return redirect(request.url)
+
     @app.errorhandler(500)
     def internal_error(error):
         db.session.rollback()
@@ -1,11 +1,18 @@
-from flask import Blueprint, render_template, url_for, flash, redirect, request, abort, jsonify
+from datetime import datetime
+from flask import (Blueprint, render_template, url_for, flash, redirect, request, abort, jsonify, current_app,
+                   Response, stream_with_context)
 from flask_login import current_user, login_required
 from app import db
 from app.models import Complaint, User
+from app.queries import NEWEST_FIRST, admin_complaints, by_relevance, filter_admin_complaints
+from app.pagination import keyset_paginate
+from app.routing import read_only, read_only_stream
+from app.cache import page_cache, request_cache_key, snapshot_page
+from app.analytics import STATUSES, get_dashboard_stats
+from app.rollups import DIMENSIONS, daily_trends
+from app.bulk import BulkActionError, apply_bulk_action, parse_ids
+from app.export import EXPORT_FORMATS, stream_export
 from functools import wraps
-from sqlalchemy import func
-from flask_paginate import Pagination, get_page_parameter
-from datetime import datetime, timedelta
 import json
 
 admin = Blueprint('admin', __name__)
@@ -22,6 +29,7 @@ def admin_required(f):
 
 @admin.route("/")
 @admin.route("/dashboard")
+@read_only
 @admin_required
 def dashboard():
     """Admin dashboard - view all complaints with filtering and assignment."""
@@ -30,85 +38,59 @@ def dashboard():
     category_filter = request.args.get('category')
     search = request.args.get('search', '')
 
-    page = request.args.get(get_page_parameter(), type=int, default=1)
     per_page = 10
 
-    query = Complaint.query.filter(Complaint.is_deleted == False)
+    def load_page():
+        query, rank = filter_admin_complaints(admin_complaints(), status_filter, category_filter, search)
+        ordering = by_relevance(rank, NEWEST_FIRST) if rank is not None else NEWEST_FIRST
+        return snapshot_page(keyset_paginate(query, ordering, per_page, cursor=request.args.get('cursor')),
+                             relations=('author', 'assignee'))
 
-    if status_filter:
-        query = query.filter_by(status=status_filter)
-    if category_filter:
-        query = query.filter_by(category=category_filter)
-    if search:
-        query = query.filter(Complaint.title.contains(search))
-
-    complaints = query.order_by(Complaint.date_posted.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    pagination = Pagination(page=page, total=complaints.total, per_page=per_page, css_framework='bootstrap5')
+    complaints = page_cache().get_or_set(request_cache_key(), load_page)
 
     # Get staff members for assignment dropdown - filter to asmedu.org only
     staff_members = User.query.filter_by(role='staff').filter(User.email.endswith('@asmedu.org')).all()
 
-    # Analytics - Status breakdown
-    total_complaints = Complaint.query.filter(Complaint.is_deleted == False).count()
-    pending_count = Complaint.query.filter(Complaint.status == 'Pending', Complaint.is_deleted == False).count()
-    
-    # New Analytics
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-    resolved_this_week = Complaint.query.filter(
-        Complaint.status == 'Resolved',
-        Complaint.is_deleted == False,
-        Complaint.date_resolved >= one_week_ago
-    ).count()
-
-    resolved_complaints = Complaint.query.filter(
-        Complaint.status == 'Resolved',
-        Complaint.is_deleted == False,
-        Complaint.date_resolved != None
-    ).all()
-
-    avg_resolution_time = 0
-    if resolved_complaints:
-        total_days = sum((c.date_resolved - c.date_posted).days for c in resolved_complaints)
-        # Avoid displaying 0 for issues resolved same-day by using max(.., 1) or decimals if needed
-        # Let's show single decimal precision:
-        avg_resolution_time = round(total_days / len(resolved_complaints), 1)
-
-    in_progress_count = Complaint.query.filter(Complaint.status == 'In Progress', Complaint.is_deleted == False).count()
-    resolved_count = Complaint.query.filter(Complaint.status == 'Resolved', Complaint.is_deleted == False).count()
-
-    # Analytics - Category breakdown
-    category_data = db.session.query(
-        Complaint.category,
-        func.count(Complaint.id).label('count')
-    ).filter(Complaint.is_deleted == False).group_by(Complaint.category).all()
-
-    # Convert to JSON-safe dict for Chart.js
-    status_counts = {
-        "Pending": pending_count,
-        "In Progress": in_progress_count,
-        "Resolved": resolved_count
-    }
-
-    category_counts = {item[0]: item[1] for item in category_data}
+    # Analytics - cached, recomputed only when complaints change
+    stats = get_dashboard_stats()
+    status_counts = stats['status_counts']
 
     # Convert to JSON strings for template
     status_counts_json = json.dumps(status_counts)
-    category_counts_json = json.dumps(category_counts)
+    category_counts_json = json.dumps(stats['category_counts'])
+    trend_json = json.dumps(stats['trend'])
 
     return render_template('admin/dashboard.html', title='Admin Dashboard',
                            complaints=complaints, staff_members=staff_members,
-                           pagination=pagination, total_complaints=total_complaints,
-                           pending_count=pending_count, in_progress_count=in_progress_count,
-                           resolved_count=resolved_count, resolved_this_week=resolved_this_week,
-                           avg_resolution_time=avg_resolution_time,
+                           total_complaints=stats['total_complaints'],
+                           pending_count=status_counts['Pending'], in_progress_count=status_counts['In Progress'],
+                           resolved_count=status_counts['Resolved'], resolved_this_week=stats['resolved_this_week'],
+                           avg_resolution_time=stats['resolution_days']['avg'],
                            status_counts_json=status_counts_json,
-                           category_counts_json=category_counts_json)
+                           category_counts_json=category_counts_json,
+                           trend_json=trend_json, trend_dimensions=DIMENSIONS,
+                           statuses=STATUSES)
+
+@admin.route("/trends")
+@read_only
+@admin_required
+def trends():
+    """Daily created/resolved/backlog series for one rollup dimension (JSON)."""
+    dimension = request.args.get('dimension', 'all')
+    if dimension not in DIMENSIONS:
+        return jsonify(error='Unknown dimension.'), 400
+    days = min(max(request.args.get('days', current_app.config['ANALYTICS_TREND_DAYS'], type=int), 1), 366)
+    data = daily_trends(dimension, days)
+    if dimension == 'staff':
+        names = dict(db.session.query(User.id, User.username).filter(User.id.in_([int(key) for key in data['series']])))
+        data['series'] = {names.get(int(key), key): values for key, values in data['series'].items()}
+    return jsonify(dimension=dimension, **data)
 
 @admin.route("/assign/<int:complaint_id>", methods=['POST'])
 @admin_required
 def assign_staff(complaint_id):
     """Assign complaint to a staff member."""
-    complaint = Complaint.query.get_or_404(complaint_id)
+    complaint = db.get_or_404(Complaint, complaint_id)
 
     if complaint.is_deleted:
         abort(404)
@@ -116,7 +98,7 @@ def assign_staff(complaint_id):
     staff_id = request.form.get('staff_id')
 
     if staff_id:
-        staff_user = User.query.get(int(staff_id))
+        staff_user = db.session.get(User, int(staff_id))
         if not staff_user or staff_user.role != 'staff':
             flash('Invalid staff selected.', 'danger')
             return redirect(url_for('admin.dashboard'))
@@ -133,7 +115,7 @@ def assign_staff(complaint_id):
 @admin_required
 def delete_complaint(complaint_id):
     """Soft delete a complaint."""
-    complaint = Complaint.query.get_or_404(complaint_id)
+    complaint = db.get_or_404(Complaint, complaint_id)
 
     if complaint.is_deleted:
         abort(404)
@@ -148,3 +130,53 @@ def delete_complaint(complaint_id):
 
     flash('Complaint deleted successfully!', 'success')
     return redirect(url_for('admin.dashboard'))
+
+@admin.route("/bulk", methods=['POST'])
+@admin_required
+def bulk_action():
+    """Assign, change status or soft delete the selected complaints at once.
+
+    Answers JSON with per-id outcomes when the client asks for it,
+    otherwise flashes a summary and returns to the dashboard.
+    """
+    wants_json = request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+    action = request.form.get('action')
+    try:
+        ids, invalid = parse_ids(request.form.getlist('ids'), current_app.config['BULK_MAX_IDS'])
+        if action == 'delete' and request.form.get('confirm') != 'yes':
+            raise BulkActionError('Deletion not confirmed.')
+        outcomes = apply_bulk_action(ids, action, current_user.id,
+                                     staff_id=request.form.get('staff_id', type=int),
+                                     status=request.form.get('status'))
+    except BulkActionError as e:
+        if wants_json:
+            return jsonify(error=str(e)), 400
+        flash(str(e), 'danger')
+        return redirect(request.referrer or url_for('admin.dashboard'))
+
+    results = [{'id': token, 'outcome': 'invalid_id'} for token in invalid]
+    results += [{'id': complaint_id, 'outcome': outcome} for complaint_id, outcome in outcomes.items()]
+    updated = sum(1 for result in results if result['outcome'] == 'updated')
+    if wants_json:
+        return jsonify(action=action, updated=updated, results=results)
+
+    skipped = len(results) - updated
+    flash(f'Updated {updated} complaint(s)' + (f'; skipped {skipped}.' if skipped else '.'),
+          'success' if updated else 'warning')
+    return redirect(request.referrer or url_for('admin.dashboard'))
+
+@admin.route("/export.<fmt>")
+@read_only
+@admin_required
+def export_complaints(fmt):
+    """Stream complaints matching the dashboard filters as CSV or NDJSON."""
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    chunks = stream_export(fmt, status=request.args.get('status'), category=request.args.get('category'),
+                           search=request.args.get('search', ''),
+                           chunk_size=current_app.config['EXPORT_CHUNK_SIZE'])
+    filename = f"complaints-{datetime.utcnow():%Y%m%d-%H%M}.{fmt}"
+    response = Response(stream_with_context(read_only_stream(chunks)), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let nginx pass chunks straight through
+    return response
@@ -0,0 +1,125 @@
+"""Aggregate statistics for the admin dashboard.
+
+Status and resolution figures come from one aggregate query over
+``complaint``; category totals and the daily trend come from one query
+over the rollup table (``app/rollups.py``), whose size does not grow
+with the number of complaints. Everything is cached in-process.
+The cache is dropped whenever a committed transaction touched a
+complaint's state, and otherwise expires after ``ANALYTICS_CACHE_TTL``
+seconds so other gunicorn workers and time-based figures such as
+"resolved this week" catch up.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import Integer, case, cast, event, func, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Complaint
+from app.rollups import dashboard_rollups, rollups_enabled
+
+STATUSES = ('Pending', 'In Progress', 'Resolved', 'Escalated')
+
+# Columns whose changes alter any dashboard figure
+_TRACKED_FIELDS = ('status', 'category', 'is_deleted', 'date_posted', 'date_resolved')
+
+_lock = threading.Lock()
+
+
+def _resolution_days():
+    # Whole days per complaint, matching timedelta.days on the old Python path
+    return cast(func.julianday(Complaint.date_resolved) - func.julianday(Complaint.date_posted), Integer)
+
+
+def compute_dashboard_stats(now=None):
+    """Run the aggregate queries and return a plain dict of figures."""
+    now = now or datetime.utcnow()
+    one_week_ago = now - timedelta(days=7)
+    is_resolved = Complaint.status == 'Resolved'
+    resolved_with_date = is_resolved & Complaint.date_resolved.isnot(None)
+    days = case((resolved_with_date, _resolution_days()))
+
+    columns = [func.count(Complaint.id).label('total')]
+    columns += [func.sum(case((Complaint.status == status, 1), else_=0)) for status in STATUSES]
+    columns += [
+        func.sum(case((is_resolved & (Complaint.date_resolved >= one_week_ago), 1), else_=0)),
+        func.avg(days),
+        func.min(days),
+        func.max(days),
+    ]
+    row = db.session.query(*columns).filter(Complaint.is_deleted == False).one()
+    total = row[0]
+    status_totals = row[1:1 + len(STATUSES)]
+    resolved_this_week, avg_days, min_days, max_days = row[1 + len(STATUSES):]
+
+    if rollups_enabled():
+        rollups = dashboard_rollups(current_app.config.get('ANALYTICS_TREND_DAYS', 90), today=now.date())
+        category_counts, trend = rollups['category_counts'], rollups['trend']
+    else:
+        category_counts = dict(db.session.query(
+            Complaint.category, func.count(Complaint.id)
+        ).filter(Complaint.is_deleted == False).group_by(Complaint.category).all())
+        trend = None
+
+    return {
+        'total_complaints': total or 0,
+        'status_counts': {status: count or 0 for status, count in zip(STATUSES, status_totals)},
+        'category_counts': category_counts,
+        'trend': trend,
+        'resolved_this_week': resolved_this_week or 0,
+        'resolution_days': {
+            'avg': round(avg_days, 1) if avg_days is not None else 0,
+            'min': min_days or 0,
+            'max': max_days or 0,
+        },
+    }
+
+
+def _cache():
+    return current_app.extensions.setdefault('analytics_cache', {'stats': None, 'at': 0.0})
+
+
+def get_dashboard_stats():
+    """Return cached dashboard figures, recomputing when stale or invalidated."""
+    cache = _cache()
+    ttl = current_app.config.get('ANALYTICS_CACHE_TTL', 60)
+    with _lock:
+        if cache['stats'] is not None and time.monotonic() - cache['at'] < ttl:
+            return cache['stats']
+    stats = compute_dashboard_stats()
+    with _lock:
+        cache['stats'], cache['at'] = stats, time.monotonic()
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """Forget cached figures. Call after bulk UPDATEs that bypass the ORM."""
+    with _lock:
+        _cache()['stats'] = None
+
+
+def _touches_stats(obj):
+    if not isinstance(obj, Complaint):
+        return False
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in _TRACKED_FIELDS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_stats_dirty(session, flush_context):
+    if any(isinstance(obj, Complaint) for obj in session.new) or \
+            any(isinstance(obj, Complaint) for obj in session.deleted) or \
+            any(_touches_stats(obj) for obj in session.dirty):
+        session.info['analytics_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop('analytics_dirty', False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('analytics_dirty', None)
@@ -0,0 +1,74 @@
+"""Automatic assignment of new complaints to the least-loaded staff member.
+
+``ASSIGNMENT_POOLS`` maps a category to the usernames of the staff who
+handle it; categories without a pool (or whose listed staff no longer
+exist) go to every staff account. A staff member's load is the number of
+live, unresolved complaints assigned to them.
+
+The least-loaded member is found with one aggregate query at assignment
+time, an outer join from the pool onto the live-assignee index, so every
+gunicorn worker sees the same committed loads. The new complaint is
+flushed first; on SQLite that takes the write lock, so concurrent
+submissions are counted one after another instead of all picking the
+same person.
+
+The complaint keeps its ``Pending`` status: the assignee moves it to
+``In Progress`` once they act on it, and until then the student can still
+edit it. Admins can reassign any complaint by hand.
+"""
+import logging
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+from app.models import Complaint, ComplaintHistory, User
+
+logger = logging.getLogger(__name__)
+
+
+def _eligible_staff():
+    # Same filter as the admin assignment dropdown
+    return (User.role == 'staff') & User.email.endswith('@asmedu.org')
+
+
+def least_loaded(usernames=None):
+    """Return ``(staff_id, username, load)`` for the least-loaded eligible staff member.
+
+    ``usernames`` limits the choice to a pool. Ties go to the lower id.
+    Returns ``None`` when nobody is eligible.
+    """
+    open_load = func.count(Complaint.id)
+    query = (
+        select(User.id, User.username, open_load)
+        .outerjoin(Complaint, (Complaint.assigned_to == User.id) & (Complaint.is_deleted == False)
+                   & (Complaint.status != 'Resolved'))
+        .where(_eligible_staff())
+        .group_by(User.id)
+        .order_by(open_load, User.id)
+        .limit(1)
+    )
+    if usernames is not None:
+        query = query.where(User.username.in_(usernames))
+    return db.session.execute(query).first()
+
+
+def auto_assign(complaint):
+    """Assign a new complaint to the least-loaded eligible staff member.
+
+    Adds the history row but leaves committing to the caller. Returns the
+    chosen ``User``, or ``None`` when auto-assignment is off or nobody is
+    eligible (the complaint then waits for an admin).
+    """
+    if not current_app.config.get('AUTO_ASSIGN_ENABLED') or complaint.assigned_to is not None:
+        return None
+    db.session.flush()
+    pool = current_app.config['ASSIGNMENT_POOLS'].get(complaint.category)
+    choice = (least_loaded(pool) if pool else None) or least_loaded()
+    if choice is None:
+        logger.info('No staff available for %r; complaint left for manual assignment', complaint.category)
+        return None
+    staff_id, username, load = choice
+    complaint.assigned_to = staff_id
+    ComplaintHistory.record(complaint, complaint.status, notes=f'Auto-assigned to {username} ({load} open).')
+    logger.info('Complaint %s (%s) auto-assigned to %s with %d open complaint(s)',
+                complaint.id, complaint.category, username, load)
+    return db.session.get(User, staff_id)
@@ -0,0 +1,106 @@
+"""Set-based admin operations on many complaints at once.
+
+A bulk request is validated in one pass (one query for the staff member,
+one for the targeted complaints), then applied with a single
+``INSERT ... SELECT`` into ``complaint_history`` where the status changes
+and a single ``UPDATE ... WHERE id IN (...)``, committed together. Every
+requested id gets an outcome:
+
+``updated``     the change was applied
+``unchanged``   already in the requested state
+``not_found``   no such complaint
+``deleted``     the complaint has been soft-deleted
+``invalid_id``  the submitted value is not a complaint id
+"""
+from datetime import datetime
+from sqlalchemy import insert, literal, select, update
+from app import db
+from app.analytics import STATUSES, invalidate_dashboard_stats
+from app.models import Complaint, ComplaintHistory, User
+
+BULK_ACTIONS = ('assign', 'status', 'delete')
+
+
+class BulkActionError(ValueError):
+    """The request as a whole is invalid (unknown action, staff or status)."""
+
+
+def parse_ids(values, limit):
+    """Split submitted ids into unique ints (in order) and invalid tokens."""
+    ids, invalid, seen = [], [], set()
+    for value in values:
+        try:
+            complaint_id = int(value)
+        except (TypeError, ValueError):
+            invalid.append(value)
+            continue
+        if complaint_id not in seen:
+            seen.add(complaint_id)
+            ids.append(complaint_id)
+    if len(ids) > limit:
+        raise BulkActionError(f'Select at most {limit} complaints at a time.')
+    return ids, invalid
+
+
+def _validate(action, staff_id, status):
+    if action not in BULK_ACTIONS:
+        raise BulkActionError('Unknown bulk action.')
+    if action == 'assign':
+        staff_user = db.session.get(User, staff_id) if staff_id else None
+        if staff_user is None or staff_user.role != 'staff':
+            raise BulkActionError('Invalid staff selected.')
+        return staff_user
+    if action == 'status' and status not in STATUSES:
+        raise BulkActionError('Invalid status selected.')
+    return None
+
+
+def apply_bulk_action(ids, action, actor_id, staff_id=None, status=None, now=None):
+    """Apply ``action`` to the complaints in ``ids``; returns ``{id: outcome}``."""
+    staff_user = _validate(action, staff_id, status)
+    now = now or datetime.utcnow()
+
+    outcomes, eligible = {}, []
+    rows = {row.id: row for row in db.session.execute(
+        select(Complaint.id, Complaint.status, Complaint.is_deleted, Complaint.assigned_to)
+        .where(Complaint.id.in_(ids))
+    )} if ids else {}
+    for complaint_id in ids:
+        row = rows.get(complaint_id)
+        if row is None:
+            outcomes[complaint_id] = 'not_found'
+        elif row.is_deleted:
+            outcomes[complaint_id] = 'deleted'
+        elif (action == 'status' and row.status == status) or \
+                (action == 'assign' and row.assigned_to == staff_user.id and row.status == 'In Progress'):
+            outcomes[complaint_id] = 'unchanged'
+        else:
+            eligible.append(complaint_id)
+
+    if not eligible:
+        return outcomes
+
+    target = Complaint.id.in_(eligible) & (Complaint.is_deleted == False)
+    values = {}
+    if action == 'delete':
+        values['is_deleted'] = True
+    else:
+        if action == 'assign':
+            new_status, notes = 'In Progress', f'Assigned to {staff_user.username}.'
+            values['assigned_to'] = staff_user.id
+        else:
+            new_status, notes = status, 'Bulk status change.'
+        values['status'] = new_status
+        # Reopening clears the resolution time so analytics and rollups drop it
+        values['date_resolved'] = now if new_status == 'Resolved' else None
+        db.session.execute(insert(ComplaintHistory).from_select(
+            ['complaint_id', 'date_changed', 'old_status', 'new_status', 'notes', 'changed_by'],
+            select(Complaint.id, literal(now), Complaint.status, literal(new_status), literal(notes),
+                   literal(actor_id)).where(target),
+        ))
+
+    db.session.execute(update(Complaint).where(target).values(**values).execution_options(synchronize_session=False))
+    db.session.commit()
+    outcomes.update(dict.fromkeys(eligible, 'updated'))
+    invalidate_dashboard_stats()
+    return {complaint_id: outcomes[complaint_id] for complaint_id in ids}
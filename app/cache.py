@@ -0,0 +1,280 @@
+"""Versioned data cache for complaint list pages.
+
+Pages of the feed and dashboards are cached as plain snapshots (column
+values plus the usernames the templates show) under a key made from the
+endpoint, the query string and a global *complaints data version*. Any
+committed change to complaints, upvotes, comments or history bumps the
+version, so stale entries are simply never looked up again and age out.
+
+The version lives in ``DATA_VERSION_FILE`` so every gunicorn worker sees
+a bump from any other; without a file (tests) it is a process counter.
+Two backends are available through ``PAGE_CACHE_BACKEND``: ``memory``
+(per-process LRU) and ``disk`` (pickles under ``PAGE_CACHE_DIR``, shared
+by all workers on the host). Per-user data such as a student's own
+upvotes must stay out of cached values.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from flask import current_app, has_app_context, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models import Comment, Complaint, ComplaintHistory, Upvote
+from app.pagination import KeysetPage
+
+# Models whose changes alter what a list page shows
+_VERSIONED_MODELS = (Complaint, Upvote, Comment, ComplaintHistory)
+_COUNTER = struct.Struct('<Q')
+
+
+class DataVersion:
+    """Monotonic counter shared through a small file (or in-process)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._value = 0
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _read(self, fd):
+        raw = os.pread(fd, _COUNTER.size, 0)
+        return _COUNTER.unpack(raw)[0] if len(raw) == _COUNTER.size else 0
+
+    def current(self):
+        if not self.path:
+            with self._lock:
+                return self._value
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+        try:
+            return self._read(fd)
+        finally:
+            os.close(fd)
+
+    def bump(self):
+        if not self.path:
+            with self._lock:
+                self._value += 1
+                return self._value
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            value = self._read(fd) + 1
+            os.pwrite(fd, _COUNTER.pack(value), 0)
+            return value
+        finally:
+            os.close(fd)
+
+
+class MemoryBackend:
+    """Per-process LRU of cached values."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend:
+    """Pickled values in a directory shared by every worker on the host.
+
+    Files are written atomically via rename; once more than
+    ``max_entries`` exist, the least recently written are removed.
+    """
+
+    def __init__(self, directory, max_entries=2048):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pickle')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if stored_key == key else None
+
+    def set(self, key, value):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._prune()
+
+    def _prune(self):
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith('.pickle')]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pickle'):
+                os.unlink(entry.path)
+
+
+class PageCache:
+    """A backend plus the shared data version and hit/miss counters."""
+
+    def __init__(self, backend, version):
+        self.backend = backend
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, compute):
+        """Return the value cached for ``key`` at the current data version."""
+        versioned_key = f'v{self.version.current()}:{key}'
+        value = self.backend.get(versioned_key) if self.backend is not None else None
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute()
+        if self.backend is not None:
+            self.backend.set(versioned_key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses,
+                    'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                    'version': self.version.current()}
+
+
+def init_page_cache(app):
+    """Attach the configured ``PageCache`` to ``app.extensions``."""
+    kind = app.config.get('PAGE_CACHE_BACKEND')
+    if kind == 'memory':
+        backend = MemoryBackend(app.config.get('PAGE_CACHE_MAX_ENTRIES', 512))
+    elif kind == 'disk':
+        backend = DiskBackend(app.config['PAGE_CACHE_DIR'], app.config.get('PAGE_CACHE_MAX_ENTRIES', 512))
+    elif not kind:
+        backend = None
+    else:
+        raise ValueError(f'Unknown PAGE_CACHE_BACKEND {kind!r}')
+    app.extensions['page_cache'] = PageCache(backend, DataVersion(app.config.get('DATA_VERSION_FILE')))
+
+
+def page_cache():
+    return current_app.extensions['page_cache']
+
+
+def request_cache_key(*parts):
+    """Key for the current endpoint and query string, plus any extra ``parts``."""
+    args = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+    return '|'.join([request.endpoint, args, *map(str, parts)])
+
+
+def bump_data_version():
+    """Invalidate every cached page. Called automatically on commit."""
+    if has_app_context() and 'page_cache' in current_app.extensions:
+        return page_cache().version.bump()
+
+
+# --- Snapshots --------------------------------------------------------------
+
+_COLUMNS = None
+
+
+def _snapshot(complaint, relations):
+    global _COLUMNS
+    if _COLUMNS is None:
+        _COLUMNS = [attr.key for attr in inspect(Complaint).column_attrs]
+    row = SimpleNamespace(**{name: getattr(complaint, name) for name in _COLUMNS})
+    for name in relations:
+        user = getattr(complaint, name)
+        setattr(row, name, SimpleNamespace(id=user.id, username=user.username) if user is not None else None)
+    return row
+
+
+def snapshot_page(page, relations=()):
+    """Copy a ``KeysetPage`` of complaints into picklable plain rows.
+
+    ``relations`` names the user relationships (``author``, ``assignee``)
+    the template reads; they must already be eagerly loaded.
+    """
+    return KeysetPage([_snapshot(c, relations) for c in page.items], page.number, page.per_page,
+                      page.total, page.next_cursor, page.prev_cursor)
+
+
+# --- Version bumps ----------------------------------------------------------
+
+def _is_versioned(obj):
+    return isinstance(obj, _VERSIONED_MODELS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_pages_dirty(session, flush_context):
+    if any(_is_versioned(obj) for obj in session.new) or \
+            any(_is_versioned(obj) for obj in session.deleted) or \
+            any(_is_versioned(obj) and session.is_modified(obj) for obj in session.dirty):
+        session.info['pages_dirty'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_writes(orm_execute_state):
+    # Bulk UPDATE/DELETE/INSERT (upvote toggles, escalation) skip the flush
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _VERSIONED_MODELS):
+        orm_execute_state.session.info['pages_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    if session.info.pop('pages_dirty', False):
+        bump_data_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('pages_dirty', None)
@@ -0,0 +1,133 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, select
+from app import db
+from app.models import Complaint, Upvote
+from app.search import rebuild_search_index
+from app.rollups import rebuild_rollups
+from app.uploads import generate_variants, referenced_images, sweep_orphans
+from app.tasks import auto_escalate_complaints, run_sqlite_maintenance
+from app.export import EXPORT_FORMATS, stream_export
+
+
+def repair_upvote_counts():
+    """Recompute Complaint.upvote_count from the Upvote table.
+
+    Only rows whose stored counter disagrees with the real count are
+    rewritten. Returns the number of complaints that were corrected.
+    """
+    actual = (
+        select(func.count(Upvote.id))
+        .where(Upvote.complaint_id == Complaint.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        db.update(Complaint)
+        .where(Complaint.upvote_count != actual)
+        .values(upvote_count=actual, updated_at=Complaint.updated_at)  # Not an edit; see _toggle_upvote
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+@click.command('repair-upvote-counts')
+@with_appcontext
+def repair_upvote_counts_command():
+    """Fix drifted complaint upvote counters."""
+    fixed = repair_upvote_counts()
+    click.echo(f'Repaired upvote counts on {fixed} complaint(s).')
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Create (if needed) and repopulate the complaint full-text index."""
+    indexed = rebuild_search_index()
+    click.echo(f'Indexed {indexed} complaint(s).')
+
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Install the rollup triggers and recompute the daily complaint rollups."""
+    rows = rebuild_rollups()
+    click.echo(f'Rebuilt {rows} daily rollup row(s).')
+
+
+@click.command('sweep-uploads')
+@click.option('--grace', default=3600, show_default=True, help='Keep files younger than this many seconds.')
+@click.option('--dry-run', is_flag=True, help='List orphaned files without deleting them.')
+@with_appcontext
+def sweep_uploads_command(grace, dry_run):
+    """Delete uploaded images and variants no complaint references."""
+    removed = sweep_orphans(grace_seconds=grace, dry_run=dry_run)
+    for path in removed:
+        click.echo(path)
+    verb = 'Would remove' if dry_run else 'Removed'
+    click.echo(f'{verb} {len(removed)} orphaned file(s).')
+
+
+@click.command('generate-image-variants')
+@with_appcontext
+def generate_image_variants_command():
+    """Create missing thumbnails/web variants for every referenced upload."""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    quality = current_app.config['IMAGE_VARIANT_QUALITY']
+    created = failed = 0
+    for filename in sorted(referenced_images()):
+        try:
+            created += bool(generate_variants(upload_folder, filename, quality))
+        except OSError as e:
+            failed += 1
+            click.echo(f'{filename}: {e}', err=True)
+    click.echo(f'Generated variants for {created} image(s), {failed} failed.')
+
+
+@click.command('escalate')
+@with_appcontext
+def escalate_command():
+    """Escalate overdue open complaints now."""
+    report = auto_escalate_complaints(current_app._get_current_object())
+    click.echo(f"Escalated {report['escalated']} complaint(s) in {report['chunks']} chunk(s), "
+               f"{report['seconds']:.3f}s.")
+
+
+@click.command('sqlite-maintenance')
+@with_appcontext
+def sqlite_maintenance_command():
+    """Checkpoint the SQLite WAL and run PRAGMA optimize."""
+    report = run_sqlite_maintenance(current_app._get_current_object())
+    if report is None:
+        click.echo('Not a SQLite database; nothing to do.')
+        return
+    click.echo(f"Checkpointed {report['checkpointed']} of {report['wal_pages']} WAL page(s)"
+               f"{' (readers active, partial)' if report['busy'] else ''}.")
+
+
+@click.command('export-complaints')
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--status', help='Only complaints with this status.')
+@click.option('--category', help='Only complaints in this category.')
+@click.option('--search', default='', help='Full-text search, as on the admin dashboard.')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='File to write (default: stdout).')
+@with_appcontext
+def export_complaints_command(fmt, status, category, search, output):
+    """Stream live complaints as CSV or NDJSON."""
+    for chunk in stream_export(fmt, status=status, category=category, search=search,
+                               chunk_size=current_app.config['EXPORT_CHUNK_SIZE']):
+        output.write(chunk)
+
+
+def register_commands(app):
+    """Attach the CampusSync maintenance commands to the Flask CLI."""
+    app.cli.add_command(repair_upvote_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(sweep_uploads_command)
+    app.cli.add_command(generate_image_variants_command)
+    app.cli.add_command(escalate_command)
+    app.cli.add_command(sqlite_maintenance_command)
+    app.cli.add_command(export_complaints_command)
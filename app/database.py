@@ -0,0 +1,59 @@
+"""SQLite engine profile.
+
+The default SQLite setup (rollback journal, no busy timeout) makes a
+writer in one gunicorn worker block every reader and fail concurrent
+writers with ``database is locked``. ``init_sqlite_profile`` applies
+``SQLITE_PRAGMAS`` to each new pooled connection: WAL lets readers run
+alongside the single writer, ``busy_timeout`` makes writers queue
+instead of failing, and the cache/mmap/temp_store settings keep hot
+pages and sort scratch space in memory.
+
+WAL files are checkpointed and planner statistics refreshed by
+``sqlite_maintenance``, run periodically by the scheduler
+(see app/tasks.py) or on demand with ``flask sqlite-maintenance``.
+"""
+from sqlalchemy import event
+from app import db
+
+
+def _pragma_listener(pragmas):
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+
+def init_sqlite_profile(app):
+    """Apply ``SQLITE_PRAGMAS`` to every new SQLite connection."""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            return
+        event.listen(db.engine, 'connect', _pragma_listener(pragmas))
+
+
+def current_pragmas(names=('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')):
+    """Return the effective value of each pragma on a pooled connection."""
+    with db.engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
+
+
+def sqlite_maintenance():
+    """Checkpoint and truncate the WAL, then let SQLite refresh its statistics.
+
+    Returns ``{'busy', 'wal_pages', 'checkpointed'}`` from the checkpoint;
+    ``busy`` is 1 if readers prevented a full checkpoint.
+    """
+    with db.engine.connect() as conn:
+        busy, wal_pages, checkpointed = conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one()
+        conn.exec_driver_sql('PRAGMA optimize')
+        conn.commit()
+    return {'busy': busy, 'wal_pages': wal_pages, 'checkpointed': checkpointed}
@@ -0,0 +1,112 @@
+"""``{% cache %}`` template tag for per-complaint HTML fragments.
+
+    {% cache 'feed-card', complaint %} ... {% endcache %}
+
+The body is rendered once per key and reused. Key parts that look like
+complaints (having ``id`` and ``updated_at``) contribute both, so a
+fragment is re-rendered as soon as the complaint's content changes.
+Upvotes leave ``updated_at`` alone, so vote counts must stay outside
+cached bodies. Cached
+bodies must not contain per-user or per-session output such as CSRF
+tokens or the viewer's upvote state. Anything else the body depends on,
+such as whether an image's thumbnail has been generated yet, has to be
+part of the key.
+
+The cache is a per-process LRU bounded by ``FRAGMENT_CACHE_MAX_BYTES``
+and is bypassed entirely when ``FRAGMENT_CACHE_ENABLED`` is false.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments with a total size limit."""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        cost = sys.getsizeof(html)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= sys.getsizeof(previous)
+            self._entries[key] = html
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self.size}
+
+
+def fragment_key(parts):
+    """Join key parts, expanding complaint-like objects to ``id@updated_at``."""
+    pieces = []
+    for part in parts:
+        if hasattr(part, 'id') and hasattr(part, 'updated_at'):
+            stamp = part.updated_at.isoformat() if part.updated_at is not None else '-'
+            pieces.append(f'{part.id}@{stamp}')
+        else:
+            pieces.append(str(part))
+    return '|'.join(pieces)
+
+
+class FragmentCacheExtension(Extension):
+    """Adds ``{% cache key, ... %}...{% endcache %}`` to the Jinja environment."""
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        cache = current_app.extensions.get('fragment_cache')
+        if cache is None or not current_app.config.get('FRAGMENT_CACHE_ENABLED', True):
+            return caller()
+        key = fragment_key(parts)
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, html)
+        return Markup(html)
+
+
+def init_fragment_cache(app):
+    """Register the ``{% cache %}`` tag and its store."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.extensions['fragment_cache'] = FragmentCache(app.config.get('FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024))
@@ -0,0 +1,147 @@
+"""In-process cache of the logged-in user's identity.
+
+Flask-Login calls ``load_user`` on every authenticated request, and the
+role decorators only need a handful of columns from it. Those columns
+(id, username, role, email) are kept in a small per-process LRU with a
+TTL, so most page views skip the ``SELECT`` from ``user``.
+
+Entries are dropped when a committed transaction changes or deletes the
+user; other gunicorn workers pick the change up once the TTL expires.
+Call ``invalidate_identity`` after bulk UPDATEs that bypass the ORM.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models import User
+
+# Columns copied into the cache; anything else needs a real User query
+IDENTITY_FIELDS = ('id', 'username', 'role', 'email')
+
+
+class Identity(UserMixin):
+    """Read-only stand-in for ``User`` carrying just the cached columns."""
+    __slots__ = IDENTITY_FIELDS
+
+    def __init__(self, id, username, role, email):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'username', username)
+        object.__setattr__(self, 'role', role)
+        object.__setattr__(self, 'email', email)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Identity is read-only; load the User to modify it')
+
+    def __repr__(self):
+        return f"Identity('{self.username}', '{self.email}', '{self.role}')"
+
+
+class IdentityCache:
+    """Thread-safe LRU of ``Identity`` objects with a per-entry TTL."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, identity):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[identity.id] = (identity, time.monotonic())
+            self._entries.move_to_end(identity.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+def init_identity_cache(app):
+    """Attach an ``IdentityCache`` sized from the app config."""
+    app.extensions['identity_cache'] = IdentityCache(
+        maxsize=app.config.get('IDENTITY_CACHE_SIZE', 1024),
+        ttl=app.config.get('IDENTITY_CACHE_TTL', 300),
+    )
+
+
+def _cache():
+    return current_app.extensions.get('identity_cache')
+
+
+def load_identity(user_id):
+    """Return the cached identity for ``user_id``, querying only on a miss."""
+    cache = _cache()
+    identity = cache.get(user_id) if cache is not None else None
+    if identity is not None:
+        return identity
+    row = db.session.query(*(getattr(User, field) for field in IDENTITY_FIELDS)).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    identity = Identity(*row)
+    if cache is not None:
+        cache.put(identity)
+    return identity
+
+
+def invalidate_identity(user_id=None):
+    """Forget one cached identity, or all of them when no id is given."""
+    cache = _cache() if has_app_context() else None
+    if cache is None:
+        return
+    if user_id is None:
+        cache.clear()
+    else:
+        cache.invalidate(user_id)
+
+
+def _touches_identity(obj):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in IDENTITY_FIELDS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_identities_dirty(session, flush_context):
+    stale = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    stale |= {obj.id for obj in session.dirty if isinstance(obj, User) and _touches_identity(obj)}
+    if stale:
+        session.info.setdefault('identity_dirty', set()).update(stale)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop('identity_dirty', ()):
+        invalidate_identity(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('identity_dirty', None)
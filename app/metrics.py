@@ -0,0 +1,170 @@
+"""Prometheus metrics served at ``/metrics``.
+
+Exported series (all prefixed ``campussync_``):
+
+``request_duration_seconds``          histogram per endpoint and method
+``requests_total``                    counter per endpoint, method and status
+``request_db_statements``             histogram of SQL statements per request
+``request_db_seconds``                histogram of SQL time per request
+``db_pool_wait_seconds``              time to check a connection out of the pool
+``upload_bytes_served_total``         upload bytes sent, per image variant
+``job_duration_seconds``              scheduled job run time, per job and outcome
+``cache_lookups_total``               page/fragment/identity cache hits and misses
+
+Under gunicorn every worker writes its samples to files in
+``PROMETHEUS_MULTIPROC_DIR`` (set up by ``gunicorn.conf.py``) and a scrape
+of any worker aggregates all of them; without that variable the values
+live in this process only, which is right for ``flask run`` and tests.
+Set ``METRICS_TOKEN`` to require ``Authorization: Bearer <token>``.
+"""
+import hmac
+import os
+import time
+from flask import Response, abort, current_app, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, \
+    generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from app import db
+
+_LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+_STATEMENT_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 20, 50, 100)
+
+REQUEST_DURATION = Histogram('campussync_request_duration_seconds', 'Request wall time',
+                             ['endpoint', 'method'], buckets=_LATENCY_BUCKETS)
+REQUESTS = Counter('campussync_requests_total', 'Requests handled', ['endpoint', 'method', 'status'])
+REQUEST_DB_STATEMENTS = Histogram('campussync_request_db_statements', 'SQL statements per request',
+                                  ['endpoint'], buckets=_STATEMENT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram('campussync_request_db_seconds', 'SQL time per request',
+                               ['endpoint'], buckets=_LATENCY_BUCKETS)
+POOL_WAIT = Histogram('campussync_db_pool_wait_seconds', 'Connection pool checkout time',
+                      buckets=(.0005, .001, .005, .01, .05, .1, .5, 1, 5, 30))
+UPLOAD_BYTES = Counter('campussync_upload_bytes_served_total', 'Upload bytes served', ['variant'])
+JOB_DURATION = Histogram('campussync_job_duration_seconds', 'Scheduled job run time', ['job', 'outcome'],
+                         buckets=(.1, .5, 1, 5, 15, 60, 300, 900))
+CACHE_LOOKUPS = Counter('campussync_cache_lookups_total', 'Cache lookups', ['cache', 'result'])
+
+_UPLOAD_ENDPOINTS = ('student.uploaded_file', 'student.uploaded_variant')
+_CACHES = ('page_cache', 'fragment_cache', 'identity_cache')
+_CACHE_SYNC_SECONDS = 1.0
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` that records how long each checkout takes.
+
+    Includes waiting for a free connection and opening a new one.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def configure_pool_timing(app):
+    """Use ``TimedQueuePool`` for pooled engines; call before ``db.init_app``."""
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if app.config.get('METRICS_ENABLED') and 'pool_size' in options and 'poolclass' not in options:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(options, poolclass=TimedQueuePool)
+
+
+def observe_job(job_id, seconds, failed=False):
+    JOB_DURATION.labels(job_id, 'failure' if failed else 'success').observe(seconds)
+
+
+# --- Per-request collection -------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics_sql' in g:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is not None and has_request_context() and 'metrics_sql' in g:
+        g.metrics_sql[0] += 1
+        g.metrics_sql[1] += time.perf_counter() - started
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql = [0, 0.0]
+
+
+class _CacheCounters:
+    """Turns the caches' cumulative hit/miss counts into counter increments."""
+
+    def __init__(self):
+        self.seen = {}
+        self.synced_at = 0.0
+
+    def sync(self, app, force=False):
+        now = time.monotonic()
+        if not force and now - self.synced_at < _CACHE_SYNC_SECONDS:
+            return
+        self.synced_at = now
+        for name in _CACHES:
+            cache = app.extensions.get(name)
+            if cache is None:
+                continue
+            stats = cache.stats()
+            for result, key in (('hit', 'hits'), ('miss', 'misses')):
+                delta = stats[key] - self.seen.get((name, key), 0)
+                if delta > 0:
+                    CACHE_LOOKUPS.labels(name, result).inc(delta)
+                self.seen[(name, key)] = stats[key]
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    statements, sql_seconds = g.pop('metrics_sql', (0, 0.0))
+    if started is None:
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    if endpoint == 'metrics':
+        return response
+    REQUEST_DURATION.labels(endpoint, request.method).observe(time.perf_counter() - started)
+    REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+    REQUEST_DB_STATEMENTS.labels(endpoint).observe(statements)
+    REQUEST_DB_SECONDS.labels(endpoint).observe(sql_seconds)
+    if endpoint in _UPLOAD_ENDPOINTS and response.status_code == 200 and response.content_length:
+        UPLOAD_BYTES.labels(request.view_args.get('variant', 'original')).inc(response.content_length)
+    current_app.extensions['metrics_caches'].sync(current_app._get_current_object())
+    return response
+
+
+# --- Exposition -------------------------------------------------------------
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(403)
+    # Flush this worker's cache counts so the scrape includes them
+    current_app.extensions['metrics_caches'].sync(current_app._get_current_object(), force=True)
+    return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Register request hooks, SQL listeners and the ``/metrics`` route."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    with app.app_context():
+        engines = [db.engine, app.extensions.get('read_engine')]
+    for engine in engines:
+        if engine is not None:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.extensions['metrics_caches'] = _CacheCounters()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
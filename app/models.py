@@ -4,14 +4,16 @@ from flask_login import UserMixin
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cached id/username/role/email; see app/identity.py
+    from app.identity import load_identity
+    return load_identity(int(user_id))
 
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(60), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default='student')  # 'student', 'admin', 'staff'
+    role = db.Column(db.String(20), nullable=False, default='student', index=True)  # 'student', 'admin', 'staff'
 
     # Relationships
     complaints = db.relationship('Complaint', backref='author', lazy=True, foreign_keys='Complaint.user_id')
@@ -20,6 +22,10 @@ class User(db.Model, UserMixin):
     def __repr__(self):
         return f"User('{self.username}', '{self.email}', '{self.role}')"
 
+# Predicate shared by the partial indexes on complaint; queries must filter on
+# is_deleted == False for SQLite to consider them.
+_LIVE = db.text('is_deleted = 0')
+
 class Complaint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -27,10 +33,12 @@ class Complaint(db.Model):
     description = db.Column(db.Text, nullable=False)
     priority = db.Column(db.String(20), nullable=False, default='Low')  # Low, Medium, High
     location = db.Column(db.String(100), nullable=False)
-    image_file = db.Column(db.String(100), nullable=True)  # UUID filename
+    image_file = db.Column(db.String(100), nullable=True)  # Content-addressed (sha256) filename
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     date_resolved = db.Column(db.DateTime, nullable=True)
     status = db.Column(db.String(20), nullable=False, default='Pending')  # Pending, In Progress, Resolved
+    # Bumped on every UPDATE, including bulk ones; keys cached template fragments
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -39,8 +47,27 @@ class Complaint(db.Model):
     # Soft delete for admin
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
 
+    # Denormalized count of Upvote rows, maintained by the upvote toggle
+    upvote_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     upvotes = db.relationship('Upvote', backref='complaint', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='complaint_ref', lazy=True, cascade='all, delete-orphan')
+    history = db.relationship('ComplaintHistory', backref='complaint', lazy=True, cascade='all, delete-orphan',
+                              order_by='ComplaintHistory.date_changed')
+
+    # Partial indexes over live rows, one per list-view filter and ordering.
+    # Key columns are ascending so a backwards scan also yields id DESC,
+    # the keyset tie-breaker, without a separate sort step.
+    __table_args__ = (
+        db.Index('ix_complaint_feed_rank', upvote_count, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_recent', date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_author', user_id, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_assignee', assigned_to, status, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_status', status, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_category', category, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_status_rank', status, upvote_count, date_posted, sqlite_where=_LIVE),
+        db.Index('ix_complaint_live_category_rank', category, upvote_count, date_posted, sqlite_where=_LIVE),
+    )
 
     def __repr__(self):
         return f"Complaint('{self.title}', '{self.date_posted}', '{self.status}')"
@@ -48,7 +75,7 @@ class Complaint(db.Model):
 class Upvote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     __table_args__ = (db.UniqueConstraint('user_id', 'complaint_id', name='_user_complaint_uc'),)
 
@@ -58,5 +85,35 @@ class Comment(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     body = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    __table_args__ = (db.Index('ix_comment_complaint_created', 'complaint_id', 'created_at'),)
     
     author = db.relationship('User', backref=db.backref('comments', lazy=True))
+
+class ComplaintHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False)
+    date_changed = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    old_status = db.Column(db.String(20), nullable=False)
+    new_status = db.Column(db.String(20), nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    changed_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # None for system changes
+    __table_args__ = (db.Index('ix_complaint_history_complaint_changed', 'complaint_id', 'date_changed'),)
+
+    @classmethod
+    def record(cls, complaint, new_status, changed_by=None, notes=None):
+        """Set a complaint's status and add the matching history row."""
+        entry = cls(complaint_id=complaint.id, old_status=complaint.status, new_status=new_status,
+                    notes=notes, changed_by=changed_by)
+        complaint.status = new_status
+        db.session.add(entry)
+        return entry
+
+class ComplaintDailyStat(db.Model):
+    """Per-day complaint counts by dimension, kept current by triggers (app/rollups.py)."""
+    __tablename__ = 'complaint_daily_stat'
+    dimension = db.Column(db.String(20), primary_key=True)  # all, category, priority, staff
+    key = db.Column(db.String(50), primary_key=True)  # '' for 'all'; staff user id as text
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    resolved = db.Column(db.Integer, nullable=False, default=0)
+    backlog_delta = db.Column(db.Integer, nullable=False, default=0)  # Net change in open complaints
@@ -0,0 +1,160 @@
+"""Keyset (cursor) pagination for complaint lists.
+
+Instead of ``OFFSET``, each page seeks past the sort key of the last row
+shown, so page N costs the same as page 1. Cursors are opaque URL-safe
+tokens carrying the boundary sort key, the page number and the total
+counted on the first page, so deep pages never re-run ``COUNT(*)``.
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from flask import request, url_for
+from sqlalchemy import and_, or_, tuple_
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+def _json_object_hook(obj):
+    if '$dt' in obj:
+        return datetime.fromisoformat(obj['$dt'])
+    return obj
+
+
+_KEY_TYPES = (str, int, float, datetime)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, default=_json_default, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the cursor state, or None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        state = json.loads(raw, object_hook=_json_object_hook)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if not isinstance(state, dict) or not isinstance(state.get('key'), list):
+        return None
+    # Reject edited tokens whose values would fail in SQL or the page maths
+    if not all(value is None or (isinstance(value, _KEY_TYPES) and not isinstance(value, bool))
+               for value in state['key']):
+        return None
+    if not _is_int(state.get('page', 2)) or not (state.get('total') is None or _is_int(state['total'])):
+        return None
+    return state
+
+
+class KeysetPage:
+    """One page of results plus the cursors to its neighbours."""
+
+    def __init__(self, items, number, per_page, total=None, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.number = number
+        self.per_page = per_page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return max(1, math.ceil(self.total / self.per_page))
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _seek_condition(order_by, key, backwards):
+    """Rows strictly after ``key`` in the given ordering (before, if backwards)."""
+    descending = {desc for _, desc in order_by}
+    if len(descending) == 1:
+        # Uniform direction: a single row-value comparison the planner can seek on
+        columns = tuple_(*[expr for expr, _ in order_by])
+        values = tuple_(*key)
+        return columns < values if descending.pop() != backwards else columns > values
+
+    clauses = []
+    for i, (expr, desc) in enumerate(order_by):
+        bound = expr < key[i] if desc != backwards else expr > key[i]
+        clauses.append(and_(*[order_by[j][0] == key[j] for j in range(i)], bound))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, order_by, per_page, cursor=None, count=True):
+    """Fetch one page of ``query`` ordered by ``order_by``.
+
+    ``order_by`` is a list of ``(expression, descending)`` pairs and must end
+    in a unique column (normally ``Complaint.id``) so every row has a distinct
+    key. ``count`` controls whether the first page runs ``COUNT(*)``; later
+    pages reuse the figure carried in the cursor.
+    """
+    state = decode_cursor(cursor)
+    if state is not None and len(state['key']) != len(order_by):
+        state = None
+
+    if state is None:
+        number = 1
+        total = query.order_by(None).count() if count else None
+        backwards = False
+    else:
+        number = max(int(state.get('page', 2)), 1)
+        total = state.get('total')
+        backwards = state.get('dir') == 'prev'
+        query = query.filter(_seek_condition(order_by, state['key'], backwards))
+
+    keys = [expr.label(f'_cursor_{i}') for i, (expr, _) in enumerate(order_by)]
+    ordering = [expr.desc() if desc != backwards else expr.asc() for expr, desc in order_by]
+    rows = query.add_columns(*keys).order_by(*ordering).limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    items = [row[0] for row in rows]
+    next_cursor = prev_cursor = None
+    if rows:
+        has_next = True if backwards else more
+        has_prev = more if backwards else state is not None
+        if has_next:
+            next_cursor = encode_cursor({'key': list(rows[-1][1:]), 'dir': 'next',
+                                         'page': number + 1, 'total': total})
+        if has_prev and number > 1:
+            prev_cursor = encode_cursor({'key': list(rows[0][1:]), 'dir': 'prev',
+                                         'page': number - 1, 'total': total})
+
+    return KeysetPage(items, number, per_page, total=total,
+                      next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+
+def cursor_url(cursor):
+    """URL of the current view with the same filters and a new cursor."""
+    args = request.args.to_dict()
+    args['cursor'] = cursor
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
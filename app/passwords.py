@@ -0,0 +1,131 @@
+"""Password hashing off the request threads.
+
+bcrypt is deliberately slow, so hashing and checking run in a small
+process pool instead of the gunicorn worker's own threads. At most
+``PASSWORD_HASH_MAX_PENDING`` operations may be queued or running per
+worker; past that, callers get ``PasswordServiceBusy`` straight away and
+can answer 503 rather than letting a burst of logins stall every page.
+
+The cost factor is ``BCRYPT_LOG_ROUNDS``; hashes stored with another
+cost are reported by ``needs_rehash`` so login can upgrade them.
+Per-operation latency is collected for sizing the pool (``hash_stats``).
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+import bcrypt
+from flask import current_app
+
+# bcrypt only looks at the first 72 bytes; older releases truncated
+# silently and bcrypt 5 raises instead, so truncate to keep old hashes valid.
+MAX_PASSWORD_BYTES = 72
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+class PasswordServiceBusy(Exception):
+    """Too many password operations are already queued in this worker."""
+
+
+def _encode(password):
+    return password.encode('utf-8')[:MAX_PASSWORD_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    try:
+        return bcrypt.checkpw(_encode(password), hashed.encode('utf-8'))
+    except ValueError:  # Malformed stored hash
+        return False
+
+
+def _get_executor(config):
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            # forkserver: forking a threaded gunicorn worker could copy held locks
+            _executor = ProcessPoolExecutor(max_workers=config['PASSWORD_HASH_WORKERS'],
+                                            mp_context=multiprocessing.get_context('forkserver'))
+            _slots = threading.BoundedSemaphore(config['PASSWORD_HASH_MAX_PENDING'])
+        return _executor, _slots
+
+
+def _record(operation, seconds=None, rejected=False):
+    with _stats_lock:
+        entry = _stats.setdefault(operation, {'count': 0, 'rejected': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        if rejected:
+            entry['rejected'] += 1
+            return
+        entry['count'] += 1
+        entry['total_seconds'] += seconds
+        entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+
+def _run(operation, func, *args):
+    config = current_app.config
+    started = time.perf_counter()
+    if config.get('PASSWORD_HASH_SYNC'):
+        result = func(*args)
+    else:
+        executor, slots = _get_executor(config)
+        if not slots.acquire(blocking=False):
+            _record(operation, rejected=True)
+            raise PasswordServiceBusy()
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            result = future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+        except FutureTimeout:
+            _record(operation, rejected=True)
+            raise PasswordServiceBusy()
+    _record(operation, time.perf_counter() - started)
+    return result
+
+
+def hash_password(password):
+    """Return a bcrypt hash of ``password`` at the configured cost."""
+    return _run('hash', _hash, password, current_app.config['BCRYPT_LOG_ROUNDS'])
+
+
+def check_password(hashed, password):
+    """Return True if ``password`` matches the stored ``hashed`` value."""
+    return _run('check', _check, hashed, password)
+
+
+def needs_rehash(hashed):
+    """True if ``hashed`` was made with a different cost than configured."""
+    try:
+        rounds = int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != current_app.config['BCRYPT_LOG_ROUNDS']
+
+
+def hash_stats():
+    """Per-operation counts, rejections and latency (seconds) for this worker."""
+    with _stats_lock:
+        return {
+            operation: dict(entry, avg_seconds=entry['total_seconds'] / entry['count'] if entry['count'] else 0.0)
+            for operation, entry in _stats.items()
+        }
+
+
+def shutdown_executor():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = _slots = None
@@ -0,0 +1,151 @@
+"""Opt-in per-request profiling and slow-query log.
+
+A request is profiled when ``PROFILING_ENABLED`` is set, or when an admin
+sends the ``PROFILING_HEADER`` header. For a profiled request:
+
+- wall time, SQL statement count and total SQL time are logged on
+  ``app.profiling`` and returned in a ``Server-Timing`` header;
+- statements slower than ``PROFILING_SLOW_QUERY_MS`` are logged with
+  their parameters and the view that issued them;
+- a ``PROFILING_SAMPLE_RATE`` fraction of requests (every header
+  request) runs under ``cProfile``; captures slower than
+  ``PROFILING_CAPTURE_THRESHOLD_MS`` (any, for header requests) are
+  written to ``PROFILING_DIR`` for ``python -m pstats`` or snakeviz.
+
+Both are off by default, and then nothing is registered at all; otherwise
+unprofiled requests cost one header lookup and each statement one flag
+check. Output goes to the dedicated ``app.profiling`` logger; the ``app``
+logger and the root logger are left as configured.
+"""
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from flask import current_app, g, has_request_context, request
+from flask.logging import default_handler, has_level_handler
+from flask_login import current_user
+from sqlalchemy import event
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Only one cProfile capture may run per process at a time
+_capture_lock = threading.Lock()
+
+_MAX_PARAMETERS_LENGTH = 500
+
+
+class RequestProfile:
+    """Timings collected for one profiled request."""
+
+    __slots__ = ('started', 'sql_count', 'sql_seconds', 'profiler', 'forced')
+
+    def __init__(self, forced=False):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.profiler = None
+        self.forced = forced
+
+
+def _current_profile():
+    return g.get('profile') if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    started = getattr(context, '_profile_started', None)
+    if profile is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile.sql_count += 1
+    profile.sql_seconds += elapsed
+    if elapsed * 1000 >= current_app.config['PROFILING_SLOW_QUERY_MS']:
+        shown = repr(parameters)
+        if len(shown) > _MAX_PARAMETERS_LENGTH:
+            shown = shown[:_MAX_PARAMETERS_LENGTH] + '...'
+        logger.warning('Slow query (%.1f ms) in %s: %s; parameters=%s',
+                       elapsed * 1000, request.endpoint, ' '.join(statement.split()), shown)
+
+
+def _requested_by_admin():
+    header = current_app.config.get('PROFILING_HEADER')
+    if not header or not request.headers.get(header):
+        return False
+    return current_user.is_authenticated and current_user.role == 'admin'
+
+
+def _start_profile():
+    forced = _requested_by_admin()
+    if not (forced or current_app.config.get('PROFILING_ENABLED')):
+        return
+    profile = g.profile = RequestProfile(forced)
+    if (forced or random.random() < current_app.config['PROFILING_SAMPLE_RATE']) \
+            and _capture_lock.acquire(blocking=False):
+        profile.profiler = cProfile.Profile()
+        profile.profiler.enable()
+
+
+def _write_capture(profiler, elapsed_ms):
+    directory = current_app.config['PROFILING_DIR']
+    os.makedirs(directory, exist_ok=True)
+    name = (f"{datetime.utcnow():%Y%m%dT%H%M%S}-{request.endpoint or 'unknown'}"
+            f"-{elapsed_ms:.0f}ms-{os.getpid()}.prof")
+    path = os.path.join(directory, name)
+    profiler.dump_stats(path)
+    return path
+
+
+def _finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    elapsed_ms = (time.perf_counter() - profile.started) * 1000
+    sql_ms = profile.sql_seconds * 1000
+    if profile.profiler is not None:
+        profile.profiler.disable()
+        _capture_lock.release()
+        if profile.forced or elapsed_ms >= current_app.config['PROFILING_CAPTURE_THRESHOLD_MS']:
+            logger.info('cProfile capture written to %s', _write_capture(profile.profiler, elapsed_ms))
+    logger.info('%s %s -> %s: %.1f ms, %d SQL statement(s) in %.1f ms', request.method, request.path,
+                response.status_code, elapsed_ms, profile.sql_count, sql_ms)
+    response.headers['Server-Timing'] = (f'app;dur={elapsed_ms:.1f}, '
+                                         f'sql;dur={sql_ms:.1f};desc="{profile.sql_count} statements"')
+    return response
+
+
+def _abandon_profile(error=None):
+    # Safety net for when after_request hooks were skipped by an error
+    profile = g.pop('profile', None)
+    if profile is not None and profile.profiler is not None:
+        profile.profiler.disable()
+        _capture_lock.release()
+
+
+def init_profiling(app):
+    """Register the profiling hooks, unless profiling can never be enabled."""
+    if not (app.config.get('PROFILING_ENABLED') or app.config.get('PROFILING_HEADER')):
+        return
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    if not has_level_handler(logger):
+        # Nothing configured to show INFO: write this logger's records to stderr
+        logger.addHandler(default_handler)
+        logger.propagate = False
+    with app.app_context():
+        engines = [db.engine, app.extensions.get('read_engine')]
+    for engine in engines:
+        if engine is not None:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
@@ -0,0 +1,112 @@
+"""Shared complaint queries with an explicit relationship-loading policy.
+
+Views build their list queries from these helpers instead of
+``Complaint.query`` so the relationships each template renders are
+loaded up front: many-to-one users via ``joinedload`` (one JOIN, safe
+with LIMIT) and collections via ``selectinload`` (one extra IN query).
+"""
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from app.models import Comment, Complaint
+from app.search import apply_search
+
+
+# Keyset orderings for app.pagination: (expression, descending) pairs that
+# always end in the primary key so each row has a unique cursor.
+NEWEST_FIRST = [(Complaint.date_posted, True), (Complaint.id, True)]
+OLDEST_FIRST = [(Complaint.date_posted, False), (Complaint.id, False)]
+MOST_UPVOTED = [(Complaint.upvote_count, True), (Complaint.date_posted, True), (Complaint.id, True)]
+
+PRIORITY_RANK = case({'High': 3, 'Medium': 2, 'Low': 1}, value=Complaint.priority, else_=0)
+# Staff work queue: most urgent first, then the longest-waiting
+PRIORITY_THEN_AGE = [(PRIORITY_RANK, True), (Complaint.date_posted, False), (Complaint.id, False)]
+
+
+def by_relevance(rank, ordering):
+    """Order search hits by bm25 rank (lower is better), then ``ordering``."""
+    return [(rank, False)] + ordering
+
+
+def live_complaints():
+    """Complaints that have not been soft deleted."""
+    return Complaint.query.filter(Complaint.is_deleted == False)
+
+
+def admin_complaints():
+    """Admin table rows render both the student and the assignee."""
+    return live_complaints().options(
+        joinedload(Complaint.author),
+        joinedload(Complaint.assignee),
+    )
+
+
+def filter_admin_complaints(query, status=None, category=None, search=None):
+    """Apply the admin dashboard filters; returns ``(query, rank)`` like apply_search."""
+    if status:
+        query = query.filter(Complaint.status == status)
+    if category:
+        query = query.filter(Complaint.category == category)
+    rank = None
+    if search:
+        query, rank = apply_search(query, search)
+    return query, rank
+
+
+def staff_complaints(staff_id):
+    """Staff task cards render the reporting student."""
+    return live_complaints().filter(Complaint.assigned_to == staff_id).options(
+        joinedload(Complaint.author),
+    )
+
+
+def staff_task_counts(staff_id):
+    """Per-status counts of a staff member's live assignments in one query."""
+    rows = db.session.query(Complaint.status, func.count(Complaint.id)).filter(
+        Complaint.assigned_to == staff_id, Complaint.is_deleted == False
+    ).group_by(Complaint.status).all()
+    return dict(rows)
+
+
+def complaint_detail_or_404(complaint_id):
+    """Detail page: the complaint, its status history, comments and comment authors."""
+    return Complaint.query.options(
+        selectinload(Complaint.history),
+        selectinload(Complaint.comments).joinedload(Comment.author),
+    ).filter(Complaint.id == complaint_id).first_or_404()
+
+
+# --- Query budget -----------------------------------------------------------
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+
+
+def _start_count():
+    g.sql_statements = 0
+
+
+def _check_budget(response):
+    budgets = current_app.config.get('QUERY_BUDGETS', {})
+    budget = budgets.get(request.endpoint, current_app.config.get('QUERY_BUDGET_DEFAULT'))
+    used = g.pop('sql_statements', 0)
+    if budget is not None and used > budget:
+        raise AssertionError(
+            f'{request.endpoint} issued {used} SQL statements, budget is {budget}')
+    return response
+
+
+def init_query_budget(app):
+    """Fail requests that issue more SQL statements than their budget.
+
+    Only active when ``QUERY_BUDGET_ENFORCED`` is set (the test config);
+    otherwise nothing is registered and there is no per-query overhead.
+    """
+    if not app.config.get('QUERY_BUDGET_ENFORCED'):
+        return
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_statement)
+    app.before_request(_start_count)
+    app.after_request(_check_budget)
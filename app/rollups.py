@@ -0,0 +1,241 @@
+"""Daily complaint rollups for the admin trend charts.
+
+``complaint_daily_stat`` holds, per day and per dimension key, how many
+live complaints were created and resolved and the net change in the open
+backlog. Each complaint contributes, under ``all`` and under its
+category, priority and assigned staff member:
+
+- ``created +1, backlog +1`` on the day it was posted, and
+- ``resolved +1, backlog -1`` on its ``date_resolved`` once resolved.
+
+Triggers on ``complaint`` subtract the old row's contribution and add the
+new one on every insert, delete and update of a tracked column, so ORM
+writes, bulk ``UPDATE`` statements, escalation and raw inserts all keep
+the table exact. ``ensure_rollups`` (run at startup) backfills an empty
+table and ``flask rebuild-rollups`` recomputes it from scratch.
+Since contributions follow the current row, reassigning or
+recategorising a complaint moves its whole history to the new key.
+
+Trend queries read ``days x keys`` rows plus one ``SUM`` per key for the
+opening backlog, however many complaints exist.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import DDL, case, event, func, literal, null, select, union_all
+from app import db
+from app.models import ComplaintDailyStat
+
+ROLLUP_TABLE = ComplaintDailyStat.__tablename__
+DIMENSIONS = ('all', 'category', 'priority', 'staff')
+
+# Key expression per dimension; {row} is NEW or OLD in triggers, complaint in rebuilds
+_KEYS = {
+    'all': "''",
+    'category': '{row}.category',
+    'priority': '{row}.priority',
+    'staff': 'CAST({row}.assigned_to AS TEXT)',
+}
+_TRACKED_COLUMNS = ('status', 'category', 'priority', 'assigned_to', 'is_deleted', 'date_posted', 'date_resolved')
+
+
+def _contributions(row, sign, source=''):
+    """SELECTs yielding ``(day, dimension, key, created, resolved, backlog_delta)`` for ``row``."""
+    selects = []
+    for dimension in DIMENSIONS:
+        key = _KEYS[dimension].format(row=row)
+        live = f'NOT {row}.is_deleted'
+        if dimension == 'staff':
+            live += f' AND {row}.assigned_to IS NOT NULL'
+        resolved = f"{live} AND {row}.status = 'Resolved' AND {row}.date_resolved IS NOT NULL"
+        selects.append(f"SELECT date({row}.date_posted) AS day, '{dimension}' AS dimension, {key} AS key, "
+                       f"{sign} AS created, 0 AS resolved, {sign} AS backlog_delta {source}WHERE {live}")
+        selects.append(f"SELECT date({row}.date_resolved), '{dimension}', {key}, 0, {sign}, {-sign} "
+                       f"{source}WHERE {resolved}")
+    return selects
+
+
+def _upsert(selects):
+    # "WHERE true" resolves SQLite's INSERT ... SELECT ... ON CONFLICT parsing ambiguity
+    return (f"INSERT INTO {ROLLUP_TABLE} (day, dimension, key, created, resolved, backlog_delta) "
+            f"SELECT * FROM ({' UNION ALL '.join(selects)}) WHERE true "
+            f"ON CONFLICT (dimension, key, day) DO UPDATE SET "
+            f"created = created + excluded.created, resolved = resolved + excluded.resolved, "
+            f"backlog_delta = backlog_delta + excluded.backlog_delta")
+
+
+_changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in _TRACKED_COLUMNS)
+
+_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_rollup_ai AFTER INSERT ON complaint BEGIN
+        {_upsert(_contributions('NEW', 1))};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_rollup_ad AFTER DELETE ON complaint BEGIN
+        {_upsert(_contributions('OLD', -1))};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_rollup_au
+        AFTER UPDATE OF {', '.join(_TRACKED_COLUMNS)} ON complaint WHEN {_changed} BEGIN
+        {_upsert(_contributions('OLD', -1) + _contributions('NEW', 1))};
+    END""",
+]
+
+_TRIGGER_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS complaint_rollup_ai',
+    'DROP TRIGGER IF EXISTS complaint_rollup_ad',
+    'DROP TRIGGER IF EXISTS complaint_rollup_au',
+]
+
+# On the metadata rather than a table: the triggers need both tables to exist
+for _statement in _TRIGGERS:
+    event.listen(ComplaintDailyStat.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in _TRIGGER_TEARDOWN:
+    event.listen(ComplaintDailyStat.metadata, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def rollups_enabled():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def rebuild_rollups():
+    """Install the triggers and recompute every rollup row from ``complaint``."""
+    if not rollups_enabled():
+        return 0
+    with db.engine.begin() as conn:
+        for statement in _TRIGGERS:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f'DELETE FROM {ROLLUP_TABLE}')
+        conn.exec_driver_sql(
+            f"INSERT INTO {ROLLUP_TABLE} (day, dimension, key, created, resolved, backlog_delta) "
+            f"SELECT day, dimension, key, SUM(created), SUM(resolved), SUM(backlog_delta) "
+            f"FROM ({' UNION ALL '.join(_contributions('complaint', 1, source='FROM complaint '))}) "
+            f"GROUP BY day, dimension, key"
+        )
+        return conn.exec_driver_sql(f'SELECT COUNT(*) FROM {ROLLUP_TABLE}').scalar()
+
+
+def ensure_rollups():
+    """Install the triggers if missing; backfill an empty table.
+
+    Returns True when the rollups had to be rebuilt (e.g. just after the
+    migration that adds the table).
+    """
+    if not rollups_enabled():
+        return False
+    with db.engine.begin() as conn:
+        for statement in _TRIGGERS:
+            conn.exec_driver_sql(statement)
+        empty = conn.exec_driver_sql(f'SELECT 1 FROM {ROLLUP_TABLE} LIMIT 1').first() is None
+        pending = conn.exec_driver_sql('SELECT 1 FROM complaint LIMIT 1').first() is not None
+    if empty and pending:
+        rebuild_rollups()
+        return True
+    return False
+
+
+@contextmanager
+def rollups_suspended():
+    """Drop the rollup triggers for a bulk load, then rebuild once."""
+    if not rollups_enabled():
+        yield
+        return
+    with db.engine.begin() as conn:
+        for statement in _TRIGGER_TEARDOWN:
+            conn.exec_driver_sql(statement)
+    try:
+        yield
+    finally:
+        rebuild_rollups()
+
+
+# --- Queries ----------------------------------------------------------------
+
+def _window(dimensions, start, keys=None):
+    """Rollup rows from ``start`` on, then one ``day=None`` row per key.
+
+    The extra row carries the key's all-time ``created`` total and its
+    backlog before ``start``. Both halves read the primary key in order.
+    """
+    stat = ComplaintDailyStat
+    scope = [stat.dimension.in_(dimensions)]
+    if keys is not None:
+        scope.append(stat.key.in_(keys))
+    totals = (
+        select(stat.dimension, stat.key, null().label('day'), func.sum(stat.created).label('created'),
+               literal(0).label('resolved'),
+               func.sum(case((stat.day < start, stat.backlog_delta), else_=0)).label('backlog_delta'))
+        .where(*scope)
+        .group_by(stat.dimension, stat.key)
+    )
+    days = select(stat.dimension, stat.key, stat.day, stat.created, stat.resolved, stat.backlog_delta) \
+        .where(*scope, stat.day >= start)
+    return db.session.execute(union_all(days, totals))
+
+
+def _series(rows, start, days):
+    """Fold ``_window`` rows into ``{(dimension, key): {...}}`` daily series and totals."""
+    series = {}
+    for row in rows:
+        entry = series.get((row.dimension, row.key))
+        if entry is None:
+            entry = series[(row.dimension, row.key)] = {
+                'created': [0] * days, 'resolved': [0] * days, 'backlog': [0] * days, 'opening': 0, 'total': 0}
+        if row.day is None:
+            entry['total'], entry['opening'] = row.created, row.backlog_delta
+            continue
+        index = (row.day - start).days
+        if index < days:
+            entry['created'][index] = row.created
+            entry['resolved'][index] = row.resolved
+            entry['backlog'][index] = row.backlog_delta
+    for entry in series.values():
+        running = entry.pop('opening')
+        for index, delta in enumerate(entry['backlog']):
+            running += delta
+            entry['backlog'][index] = running
+    return series
+
+
+def _labels(days, today):
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    return start, [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+
+def _empty(days):
+    return {'created': [0] * days, 'resolved': [0] * days, 'backlog': [0] * days}
+
+
+def dashboard_rollups(days=90, today=None):
+    """The overall trend and live complaints per category, in one query.
+
+    Returns ``{'trend': {'labels': [...], 'created': [...], 'resolved':
+    [...], 'backlog': [...]}, 'category_counts': {category: count}}``.
+    """
+    start, labels = _labels(days, today)
+    series = _series(_window(('all', 'category'), start), start, days)
+    overall = series.get(('all', ''), _empty(days))
+    trend = {'labels': labels, **{name: overall[name] for name in ('created', 'resolved', 'backlog')}}
+    categories = {key: entry['total'] for (dimension, key), entry in series.items()
+                  if dimension == 'category' and entry['total'] > 0}
+    return {'trend': trend, 'category_counts': categories}
+
+
+def daily_trends(dimension, days=90, limit=10, today=None):
+    """Created/resolved/backlog per day for the last ``days`` days, per key.
+
+    Returns ``{'labels': [...], 'series': {key: {'created': [...],
+    'resolved': [...], 'backlog': [...]}}}``. Only the ``limit`` keys with
+    the largest current backlog are included.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f'Unknown rollup dimension {dimension!r}')
+    start, labels = _labels(days, today)
+    stat = ComplaintDailyStat
+    keys = list(db.session.execute(
+        select(stat.key).where(stat.dimension == dimension).group_by(stat.key)
+        .order_by(func.sum(stat.backlog_delta).desc(), func.sum(stat.created).desc(), stat.key)
+        .limit(limit)
+    ).scalars())
+    series = _series(_window((dimension,), start, keys), start, days) if keys else {}
+    return {'labels': labels,
+            'series': {key: {name: values for name, values in series[(dimension, key)].items() if name != 'total'}
+                       for key in keys}}
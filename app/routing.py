@@ -0,0 +1,102 @@
+"""Read/write routing for the database session.
+
+Views marked with ``@read_only`` run their queries on a separate read
+engine: ``SQLALCHEMY_READ_URI`` when a replica is configured, otherwise a
+``mode=ro`` URI connection to the primary SQLite file. Read connections
+open their transactions with ``BEGIN DEFERRED``, so a request sees one
+consistent WAL snapshot and never takes the write lock; ORM flushes and
+every unmarked view keep using the primary engine.
+
+In-memory databases (the tests) have no second connection to route to,
+so everything stays on the primary there.
+"""
+from functools import wraps
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+
+class RoutingSession(Session):
+    """Session that sends reads from ``@read_only`` views to the read engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('db_read_only'):
+            engine = current_app.extensions.get('read_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Mark a view as read-only so its queries use the read engine."""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        previous = g.get('db_read_only', False)
+        g.db_read_only = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.db_read_only = previous
+    return decorated_function
+
+
+def read_only_stream(chunks):
+    """Keep read routing while a streamed response body is generated.
+
+    ``@read_only`` resets its flag when the view returns, before
+    ``stream_with_context`` starts pulling the body.
+    """
+    previous = g.get('db_read_only', False)
+    g.db_read_only = True
+    try:
+        yield from chunks
+    finally:
+        g.db_read_only = previous
+
+
+def read_uri(config):
+    """URL of the read engine, or None when reads can't be split off."""
+    if config.get('SQLALCHEMY_READ_URI'):
+        return config['SQLALCHEMY_READ_URI']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:') \
+            or url.database.startswith('file:'):
+        return None
+    return f'sqlite:///file:{url.database}?mode=ro&uri=true'
+
+
+def _deferred_snapshots(engine, pragmas):
+    # pysqlite issues its own BEGIN only before writes; take over so every
+    # read transaction starts with an explicit deferred BEGIN.
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN DEFERRED')
+
+
+def init_read_routing(app):
+    """Create the read engine, if any, and store it in ``app.extensions``."""
+    uri = read_uri(app.config)
+    if uri is None:
+        return None
+    engine = create_engine(uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if engine.dialect.name == 'sqlite':
+        # journal_mode is a property of the file and can't be set read-only
+        pragmas = {name: value for name, value in app.config.get('SQLITE_PRAGMAS', {}).items()
+                   if name != 'journal_mode'}
+        pragmas['query_only'] = 'ON'
+        _deferred_snapshots(engine, pragmas)
+    app.extensions['read_engine'] = engine
+    return engine
@@ -0,0 +1,150 @@
+"""Full-text search over complaints backed by an SQLite FTS5 index.
+
+``complaint_fts`` is an external-content FTS5 table over the complaint's
+title, description, location and category. Triggers on ``complaint`` keep
+it in sync, so ORM writes and bulk ``UPDATE`` statements are both covered.
+"""
+import re
+from contextlib import contextmanager
+from sqlalchemy import DDL, event, false, func, literal_column, or_, select, table, column, text
+from app import db
+from app.models import Complaint
+
+FTS_TABLE = 'complaint_fts'
+
+# Relative bm25 weights for title, description, location, category
+BM25_WEIGHTS = (10.0, 1.0, 3.0, 3.0)
+
+_FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location, category,
+        content='complaint', content_rowid='id', tokenize='unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_fts_ai AFTER INSERT ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location, category)
+        VALUES (new.id, new.title, new.description, new.location, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_fts_ad AFTER DELETE ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location, category)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaint_fts_au
+        AFTER UPDATE OF title, description, location, category ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location, category)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location, category)
+        VALUES (new.id, new.title, new.description, new.location, new.category);
+    END""",
+]
+
+_FTS_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS complaint_fts_ai',
+    'DROP TRIGGER IF EXISTS complaint_fts_ad',
+    'DROP TRIGGER IF EXISTS complaint_fts_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+for _statement in _FTS_SCHEMA:
+    event.listen(Complaint.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in _FTS_TEARDOWN:
+    event.listen(Complaint.__table__, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+
+_fts = table(FTS_TABLE, column('rowid'))
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def build_match_expression(search):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and terms are ANDed, so
+    ``"wifi lib"`` matches complaints mentioning both "wifi" and "library".
+    The tokenizer splits on punctuation, so "wi-fi" is indexed as "wi" and
+    "fi" and is found by ``"wi fi"`` rather than ``"wifi"``.
+    Quoting keeps FTS5 operators typed by users from being interpreted.
+    """
+    tokens = _TOKEN_RE.findall(search or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(query, search):
+    """Restrict a Complaint query to rows matching ``search``.
+
+    Returns ``(query, rank)`` where ``rank`` is the bm25 score to order by
+    (lower is more relevant), or ``None`` when ranking is unavailable.
+    Status/category filters and pagination compose with the returned query.
+    """
+    if not fts_enabled():
+        pattern = or_(Complaint.title.contains(search), Complaint.description.contains(search))
+        return query.filter(pattern), None
+
+    match = build_match_expression(search)
+    if not match:
+        return query.filter(false()), None
+
+    fts_ref = literal_column(FTS_TABLE)
+    matches = (
+        select(_fts.c.rowid.label('complaint_id'),
+               func.bm25(fts_ref, *BM25_WEIGHTS).label('rank'))
+        .select_from(_fts)
+        .where(fts_ref.op('MATCH')(match))
+        .subquery('search_matches')
+    )
+    query = query.join(matches, matches.c.complaint_id == Complaint.id)
+    return query, matches.c.rank
+
+
+def ensure_search_index():
+    """Create the FTS table and triggers if missing; backfill a new table.
+
+    Returns True when the index had to be built.
+    """
+    if not fts_enabled():
+        return False
+    with db.engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+        ).first()
+        for statement in _FTS_SCHEMA:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return not exists
+
+
+def rebuild_search_index():
+    """Create the index if missing and repopulate it from the complaint table.
+
+    Also merges the index segments. Returns the number of complaints.
+    """
+    if not fts_enabled():
+        return 0
+    with db.engine.begin() as conn:
+        for statement in _FTS_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        return conn.exec_driver_sql('SELECT COUNT(*) FROM complaint').scalar()
+
+
+@contextmanager
+def search_index_suspended():
+    """Drop the sync triggers for a bulk load, then rebuild the index once.
+
+    Much faster than updating the index row by row for large inserts.
+    """
+    if not fts_enabled():
+        yield
+        return
+    with db.engine.begin() as conn:
+        for statement in _FTS_TEARDOWN:
+            if statement.startswith('DROP TRIGGER'):
+                conn.exec_driver_sql(statement)
+    try:
+        yield
+    finally:
+        rebuild_search_index()
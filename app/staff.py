@@ -2,6 +2,9 @@ from flask import Blueprint, render_template, url_for, flash, redirect, request,
 from flask_login import current_user, login_required
 from app import db
 from app.models import Complaint
+from app.queries import NEWEST_FIRST, PRIORITY_THEN_AGE, staff_complaints, staff_task_counts
+from app.pagination import keyset_paginate
+from app.routing import read_only
 from functools import wraps
 from datetime import datetime
 
@@ -17,23 +20,46 @@ def staff_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+TASK_TABS = ('open', 'resolved')
+
 @staff.route("/")
 @staff.route("/dashboard")
+@read_only
 @staff_required
 def dashboard():
-    """Staff dashboard - view assigned complaints."""
-    complaints = Complaint.query.filter(
-        Complaint.assigned_to == current_user.id,
-        Complaint.is_deleted == False
-    ).order_by(Complaint.date_posted.desc()).all()
+    """Staff dashboard - assigned complaints, split into open and resolved tabs."""
+    tab = request.args.get('tab', 'open')
+    if tab not in TASK_TABS:
+        tab = 'open'
+    per_page = 12
+
+    status_counts = staff_task_counts(current_user.id)
+    resolved_total = status_counts.get('Resolved', 0)
+    tab_counts = {
+        'open': sum(status_counts.values()) - resolved_total,
+        'resolved': resolved_total,
+    }
+
+    query = staff_complaints(current_user.id)
+    if tab == 'resolved':
+        query = query.filter(Complaint.status == 'Resolved')
+        ordering = NEWEST_FIRST
+    else:
+        query = query.filter(Complaint.status != 'Resolved')
+        ordering = PRIORITY_THEN_AGE
+
+    # Totals come from the aggregate above, so skip the per-page COUNT(*)
+    complaints = keyset_paginate(query, ordering, per_page, cursor=request.args.get('cursor'), count=False)
+    complaints.total = tab_counts[tab]
 
-    return render_template('staff/dashboard.html', title='Staff Tasks', complaints=complaints)
+    return render_template('staff/dashboard.html', title='Staff Tasks', complaints=complaints,
+                           tab=tab, tab_counts=tab_counts, status_counts=status_counts)
 
 @staff.route("/update/<int:complaint_id>", methods=['GET', 'POST'])
 @staff_required
 def update_complaint(complaint_id):
     """Update complaint status - only assigned complaints."""
-    complaint = Complaint.query.get_or_404(complaint_id)
+    complaint = db.get_or_404(Complaint, complaint_id)
 
     if complaint.is_deleted:
         abort(404)
@@ -40,3 +40,92 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 });
+
+// Upvotes and comments without a page reload. Forms carrying a
+// data-upvote-url / data-comment-url are posted to the JSON endpoints;
+// if that fails for any reason the normal form submission goes ahead.
+document.addEventListener('DOMContentLoaded', () => {
+    const postJSON = async (url, form) => {
+        const response = await fetch(url, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { 'Accept': 'application/json' },
+            credentials: 'same-origin',
+        });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+    };
+
+    document.querySelectorAll('form[data-upvote-url]').forEach(form => {
+        form.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const button = form.querySelector('button[type="submit"]');
+            button.disabled = true;
+            try {
+                const data = await postJSON(form.dataset.upvoteUrl, form);
+                button.textContent = data.upvote_count;
+                button.classList.toggle('btn-primary', data.upvoted);
+                button.classList.toggle('btn-ghost', !data.upvoted);
+            } catch (err) {
+                form.submit();
+            } finally {
+                button.disabled = false;
+            }
+        });
+    });
+
+    const renderComment = (comment) => {
+        const item = document.createElement('div');
+        item.style.cssText = 'margin-bottom: 20px; padding-bottom: 20px; border-bottom: 1px solid var(--stone);';
+        const header = document.createElement('div');
+        header.style.cssText = 'display: flex; justify-content: space-between; margin-bottom: 8px;';
+        const who = document.createElement('div');
+        const author = document.createElement('strong');
+        author.textContent = comment.author;
+        const role = document.createElement('span');
+        role.className = 'badge';
+        role.style.cssText = 'background: var(--accent-soft); color: var(--accent); margin-left: 8px;';
+        role.textContent = comment.role;
+        who.append(author, role);
+        const when = document.createElement('small');
+        when.style.color = 'var(--mid)';
+        when.textContent = comment.created_at;
+        header.append(who, when);
+        const body = document.createElement('p');
+        body.style.cssText = 'white-space: pre-wrap; color: var(--ink);';
+        body.textContent = comment.body;
+        item.append(header, body);
+        return item;
+    };
+
+    document.querySelectorAll('form[data-comment-url]').forEach(form => {
+        const list = document.querySelector('[data-comment-list]');
+        form.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const button = form.querySelector('button[type="submit"]');
+            button.disabled = true;
+            try {
+                const comment = await postJSON(form.dataset.commentUrl, form);
+                const empty = list.querySelector('[data-comment-empty]');
+                if (empty) empty.remove();
+                list.appendChild(renderComment(comment));
+                form.reset();
+            } catch (err) {
+                form.submit();
+            } finally {
+                button.disabled = false;
+            }
+        });
+    });
+});
+
+// "Select all" checkboxes: data-select-all="<name>" toggles every
+// checkbox with that name (e.g. the admin bulk-action rows).
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-select-all]').forEach(toggle => {
+        toggle.addEventListener('change', () => {
+            document.querySelectorAll(`input[type="checkbox"][name="${toggle.dataset.selectAll}"]`)
+                .forEach(box => { box.checked = toggle.checked; });
+        });
+    });
+});
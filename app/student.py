@@ -1,11 +1,19 @@
-import os
-import uuid
-from flask import Blueprint, render_template, url_for, flash, redirect, request, current_app, abort, send_from_directory
+from datetime import datetime
+from flask import Blueprint, render_template, url_for, flash, redirect, request, current_app, abort, jsonify
 from flask_login import current_user, login_required
 from werkzeug.utils import secure_filename
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app import db
 from app.models import Complaint
-from flask_paginate import Pagination, get_page_parameter
+from app.assignment import auto_assign
+from app.search import apply_search
+from app.queries import (MOST_UPVOTED, NEWEST_FIRST, OLDEST_FIRST, by_relevance,
+                         complaint_detail_or_404, live_complaints)
+from app.pagination import keyset_paginate
+from app.routing import read_only
+from app.cache import page_cache, request_cache_key, snapshot_page
+from app.uploads import VARIANT_DIR, VARIANTS, UploadRejected, send_upload, store_upload, variant_name
 from functools import wraps
 
 student = Blueprint('student', __name__)
@@ -25,17 +33,19 @@ def _allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config.get('ALLOWED_EXTENSIONS', set())
 
 def save_picture(form_picture):
-    """Save uploaded image with unique filename."""
+    """Store an uploaded image and return its content-addressed filename.
+
+    Returns None (after flashing the reason) if the upload is rejected.
+    """
     filename = secure_filename(form_picture.filename)
     if filename == '' or not _allowed_file(filename):
+        flash('Only PNG and JPEG images are allowed.', 'warning')
+        return None
+    try:
+        return store_upload(form_picture)
+    except UploadRejected as e:
+        flash(str(e), 'warning')
         return None
-    _, f_ext = os.path.splitext(filename)
-    unique_filename = str(uuid.uuid4()) + f_ext
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    os.makedirs(upload_folder, exist_ok=True)
-    picture_path = os.path.join(upload_folder, unique_filename)
-    form_picture.save(picture_path)
-    return unique_filename
 
 @student.route("/")
 def landing():
@@ -50,10 +60,10 @@ def landing():
     return render_template('index.html')
 
 @student.route("/dashboard")
+@read_only
 @student_required
 def dashboard():
 
-    page = request.args.get(get_page_parameter(), type=int, default=1)
     per_page = 10
 
     # Search, Filter, Sort
@@ -62,28 +72,32 @@ def dashboard():
     status_filter = request.args.get('status', '')
     sort_by = request.args.get('sort', 'newest')
 
-    query = Complaint.query.filter(Complaint.user_id == current_user.id, Complaint.is_deleted == False)
-
-    if search:
-        query = query.filter(Complaint.title.contains(search) | Complaint.description.contains(search))
-    if category_filter:
-        query = query.filter(Complaint.category == category_filter)
-    if status_filter:
-        query = query.filter(Complaint.status == status_filter)
-
-    if sort_by == 'oldest':
-        query = query.order_by(Complaint.date_posted.asc())
-    elif sort_by == 'upvoted':
-        from app.models import Upvote
-        from sqlalchemy import func
-        query = query.outerjoin(Upvote).group_by(Complaint.id).order_by(func.count(Upvote.id).desc(), Complaint.date_posted.desc())
-    else:
-        query = query.order_by(Complaint.date_posted.desc())
+    def load_page():
+        query = live_complaints().filter(Complaint.user_id == current_user.id)
+
+        rank = None
+        if search:
+            query, rank = apply_search(query, search)
+        if category_filter:
+            query = query.filter(Complaint.category == category_filter)
+        if status_filter:
+            query = query.filter(Complaint.status == status_filter)
+
+        if sort_by == 'oldest':
+            ordering = OLDEST_FIRST
+        elif sort_by == 'upvoted':
+            ordering = MOST_UPVOTED
+        else:
+            ordering = NEWEST_FIRST
+        # Searches without an explicit sort are ordered by relevance
+        if rank is not None and 'sort' not in request.args:
+            ordering = by_relevance(rank, NEWEST_FIRST)
 
-    complaints = query.paginate(page=page, per_page=per_page, error_out=False)
-    pagination = Pagination(page=page, total=complaints.total, per_page=per_page, css_framework='bootstrap5')
+        return snapshot_page(keyset_paginate(query, ordering, per_page, cursor=request.args.get('cursor')))
 
-    return render_template('student/dashboard.html', title='My Complaints', complaints=complaints, pagination=pagination)
+    complaints = page_cache().get_or_set(request_cache_key(current_user.id), load_page)
+
+    return render_template('student/dashboard.html', title='My Complaints', complaints=complaints)
 
 @student.route("/complaint/new", methods=['GET', 'POST'])
 @student_required
@@ -109,6 +123,7 @@ def new_complaint():
                               location=location, description=description,
                               image_file=picture_file, user_id=current_user.id)
         db.session.add(complaint)
+        auto_assign(complaint)
         db.session.commit()
 
         flash('Your complaint has been registered!', 'success')
@@ -120,7 +135,7 @@ def new_complaint():
 @student_required
 def edit_complaint(complaint_id):
     """Edit complaint - only if status is Pending."""
-    complaint = Complaint.query.get_or_404(complaint_id)
+    complaint = db.get_or_404(Complaint, complaint_id)
 
     if complaint.user_id != current_user.id or complaint.status != 'Pending' or complaint.is_deleted:
         abort(403)
@@ -132,11 +147,15 @@ def edit_complaint(complaint_id):
         complaint.location = request.form.get('location')
         complaint.description = request.form.get('description')
 
-        # Handle file upload
+        # Handle file upload; a rejected file keeps the current image
         if 'image' in request.files:
             file = request.files['image']
             if file.filename != '':
                 picture_file = save_picture(file)
+                if picture_file is None:
+                    # Show the form again with the edits; nothing is committed
+                    return render_template('student/edit_complaint.html', title='Edit Complaint',
+                                           complaint=complaint)
                 complaint.image_file = picture_file
 
         db.session.commit()
@@ -146,10 +165,11 @@ def edit_complaint(complaint_id):
     return render_template('student/edit_complaint.html', title='Edit Complaint', complaint=complaint)
 
 @student.route("/complaint/<int:complaint_id>")
+@read_only
 @login_required
 def view_complaint(complaint_id):
     """View complaint details."""
-    complaint = Complaint.query.get_or_404(complaint_id)
+    complaint = complaint_detail_or_404(complaint_id)
 
     if complaint.is_deleted:
         abort(403)
@@ -162,76 +182,166 @@ def view_complaint(complaint_id):
     return render_template('student/view_complaint.html', title=complaint.title, complaint=complaint, has_upvoted=has_upvoted)
 
 @student.route("/feed")
+@read_only
 @student_required
 def feed():
     search = request.args.get('search', '')
     category_filter = request.args.get('category', '')
     status_filter = request.args.get('status', '')
     
-    page = request.args.get(get_page_parameter(), type=int, default=1)
     per_page = 10
 
     from app.models import Upvote
-    from sqlalchemy import func
-
-    query = Complaint.query.filter(Complaint.is_deleted == False)
-
-    if search:
-        query = query.filter(Complaint.title.contains(search) | Complaint.description.contains(search))
-    if category_filter:
-        query = query.filter(Complaint.category == category_filter)
-    if status_filter:
-        query = query.filter(Complaint.status == status_filter)
 
-    query = query.outerjoin(Upvote).group_by(Complaint.id).order_by(func.count(Upvote.id).desc(), Complaint.date_posted.desc())
+    def load_page():
+        query = live_complaints()
+
+        rank = None
+        if search:
+            query, rank = apply_search(query, search)
+        if category_filter:
+            query = query.filter(Complaint.category == category_filter)
+        if status_filter:
+            query = query.filter(Complaint.status == status_filter)
+
+        ordering = by_relevance(rank, MOST_UPVOTED) if rank is not None else MOST_UPVOTED
+        return snapshot_page(keyset_paginate(query, ordering, per_page, cursor=request.args.get('cursor')))
+
+    # Shared by every student; their own upvotes are looked up separately
+    complaints = page_cache().get_or_set(request_cache_key(), load_page)
+
+    page_ids = [c.id for c in complaints]
+    user_upvotes = set()
+    if page_ids:
+        user_upvotes = {complaint_id for (complaint_id,) in db.session.query(Upvote.complaint_id).filter(
+            Upvote.user_id == current_user.id, Upvote.complaint_id.in_(page_ids))}
+
+    return render_template('student/feed.html', title='Browse Complaints', complaints=complaints, user_upvotes=user_upvotes)
+
+def _toggle_upvote(user_id, complaint_id):
+    """Add or remove a user's upvote and keep Complaint.upvote_count in step.
+
+    No SELECT is needed: a ``DELETE ... RETURNING`` reports an existing
+    upvote, otherwise an insert-or-ignore adds one (only for a live
+    complaint), and the counter is adjusted in-database with
+    ``UPDATE ... RETURNING``, so concurrent toggles cannot lose updates.
+    Returns ``(upvoted, upvote_count)``, or None if the complaint does not
+    exist or is deleted; the caller commits or rolls back.
+    """
+    from app.models import Upvote
+    removed = db.session.execute(
+        delete(Upvote).where(Upvote.user_id == user_id, Upvote.complaint_id == complaint_id)
+        .returning(Upvote.id)
+    ).first()
+    if removed:
+        upvoted, delta = False, -1
+    else:
+        live = select(literal(user_id), Complaint.id, literal(datetime.utcnow())).where(
+            Complaint.id == complaint_id, Complaint.is_deleted == False)
+        inserted = db.session.execute(
+            sqlite_insert(Upvote).from_select(['user_id', 'complaint_id', 'created_at'], live)
+            .on_conflict_do_nothing()
+        ).rowcount
+        # Nothing inserted: a concurrent request from this user won the race
+        upvoted, delta = True, inserted
+    # Keeping updated_at as it is skips its onupdate bump: votes don't change
+    # the cached card fragments (app/fragments.py) and aren't edits
+    count = db.session.execute(
+        update(Complaint).where(Complaint.id == complaint_id, Complaint.is_deleted == False)
+        .values(upvote_count=Complaint.upvote_count + delta, updated_at=Complaint.updated_at)
+        .returning(Complaint.upvote_count)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if count is None:
+        return None
+    return upvoted, count
 
-    complaints = query.paginate(page=page, per_page=per_page, error_out=False)
-    pagination = Pagination(page=page, total=complaints.total, per_page=per_page, css_framework='bootstrap5')
+def _add_comment(complaint_id, author_id, body):
+    """Insert a comment on a live complaint in one statement.
 
-    user_upvotes = {u.complaint_id for u in Upvote.query.filter_by(user_id=current_user.id).all()}
+    Returns the new row's ``(id, created_at)``, or None if the complaint
+    does not exist or is deleted.
+    """
+    from app.models import Comment
+    live = select(Complaint.id, literal(author_id), literal(body), literal(datetime.utcnow())).where(
+        Complaint.id == complaint_id, Complaint.is_deleted == False)
+    return db.session.execute(
+        insert(Comment).from_select(['complaint_id', 'author_id', 'body', 'created_at'], live)
+        .returning(Comment.id, Comment.created_at)
+    ).first()
 
-    return render_template('student/feed.html', title='Browse Complaints', complaints=complaints, pagination=pagination, user_upvotes=user_upvotes)
+def _api_error(message, status):
+    return jsonify(error=message), status
 
 @student.route("/upvote/<int:complaint_id>", methods=['POST'])
 @student_required
 def upvote(complaint_id):
-    complaint = Complaint.query.get_or_404(complaint_id)
-    if complaint.is_deleted:
+    result = _toggle_upvote(current_user.id, complaint_id)
+    if result is None:
+        db.session.rollback()
         abort(404)
-        
-    from app.models import Upvote
-    existing = Upvote.query.filter_by(user_id=current_user.id, complaint_id=complaint.id).first()
-    
-    if existing:
-        db.session.delete(existing)
-        flash('Upvote removed.', 'info')
-    else:
-        new_upvote = Upvote(user_id=current_user.id, complaint_id=complaint.id)
-        db.session.add(new_upvote)
-        flash('Complaint upvoted!', 'success')
-        
     db.session.commit()
+
+    if result[0]:
+        flash('Complaint upvoted!', 'success')
+    else:
+        flash('Upvote removed.', 'info')
     return redirect(request.referrer or url_for('student.feed'))
 
+@student.route("/api/complaint/<int:complaint_id>/upvote", methods=['POST'])
+def upvote_json(complaint_id):
+    """Toggle an upvote and return the new state for in-place updates."""
+    if not current_user.is_authenticated or current_user.role != 'student':
+        return _api_error('Only students can upvote.', 403)
+    result = _toggle_upvote(current_user.id, complaint_id)
+    if result is None:
+        db.session.rollback()
+        return _api_error('Complaint not found.', 404)
+    db.session.commit()
+    upvoted, count = result
+    return jsonify(complaint_id=complaint_id, upvoted=upvoted, upvote_count=count)
+
 @student.route("/complaint/<int:complaint_id>/comment", methods=['POST'])
 @login_required
 def post_comment(complaint_id):
-    complaint = Complaint.query.get_or_404(complaint_id)
-    if complaint.is_deleted:
-        abort(404)
-        
     body = request.form.get('body')
     if body:
-        from app.models import Comment
-        comment = Comment(body=body, author_id=current_user.id, complaint_id=complaint.id)
-        db.session.add(comment)
+        if _add_comment(complaint_id, current_user.id, body) is None:
+            db.session.rollback()
+            abort(404)
         db.session.commit()
         flash('Comment posted!', 'success')
-        
+    elif Complaint.query.filter_by(id=complaint_id, is_deleted=False).first() is None:
+        abort(404)
+
     return redirect(request.referrer or url_for('student.dashboard'))
 
+@student.route("/api/complaint/<int:complaint_id>/comments", methods=['POST'])
+def post_comment_json(complaint_id):
+    """Add a comment and return it for appending to the list in place."""
+    if not current_user.is_authenticated:
+        return _api_error('Please log in to comment.', 401)
+    body = (request.form.get('body') or '').strip()
+    if not body:
+        return _api_error('Comment cannot be empty.', 400)
+    row = _add_comment(complaint_id, current_user.id, body)
+    if row is None:
+        db.session.rollback()
+        return _api_error('Complaint not found.', 404)
+    db.session.commit()
+    return jsonify(id=row.id, complaint_id=complaint_id, body=body, author=current_user.username,
+                   role=current_user.role, created_at=row.created_at.strftime('%Y-%m-%d %H:%M')), 201
+
 @student.route("/uploads/<filename>")
 @login_required
 def uploaded_file(filename):
     """Serve uploaded files."""
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+    return send_upload(filename)
+
+@student.route("/uploads/<variant>/<filename>")
+@login_required
+def uploaded_variant(variant, filename):
+    """Serve a downscaled variant (thumb/web) of an uploaded image."""
+    if variant not in VARIANTS:
+        abort(404)
+    return send_upload(f'{VARIANT_DIR}/{variant_name(filename, variant)}')
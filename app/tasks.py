@@ -1,36 +1,225 @@
+"""Background jobs: complaint auto-escalation, SQLite upkeep and a lightweight scheduler.
+
+Escalation is set-based: overdue complaint ids are walked in primary-key
+chunks and each chunk is escalated with one ``INSERT ... SELECT`` into
+``complaint_history`` plus one ``UPDATE ... WHERE`` in a short
+transaction. Already escalated or resolved complaints never match, so a
+run interrupted by a restart is simply finished by the next one.
+
+The scheduler is a daemon thread per process. Only the process holding
+an exclusive ``flock`` on ``SCHEDULER_LOCK_FILE`` runs jobs, so starting
+it in every gunicorn worker still yields a single runner; if that worker
+dies the OS drops the lock and another worker takes over.
+"""
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from sqlalchemy import insert, literal, null, select, update
+from app import db
+from app.metrics import observe_job
 from app.models import Complaint, ComplaintHistory
 
-def auto_escalate_complaints(app):
-    """Auto-escalate complaints older than 3 days that are not resolved."""
+logger = logging.getLogger(__name__)
+
+ESCALATED = 'Escalated'
+CLOSED_STATUSES = ('Resolved', ESCALATED)
+
+
+@contextmanager
+def job_context(app):
+    """App context for a job; a failing job's transaction is rolled back in it.
+
+    The session is scoped to the app context, so the rollback has to happen
+    before the job's own context is popped.
+    """
     with app.app_context():
-        three_days_ago = datetime.utcnow() - timedelta(days=3)
-        pending_complaints = Complaint.query.filter(
-            ~Complaint.status.in_(['Resolved', 'Escalated']),
-            Complaint.date_posted <= three_days_ago,
-            Complaint.is_deleted == False
+        try:
+            yield
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def _escalate_chunks(overdue, notes, now, chunk_size):
+    """Escalate every complaint matching ``overdue`` in id-ordered chunks."""
+    escalated = chunks = 0
+    last_id = 0
+    while True:
+        ids = db.session.scalars(
+            select(Complaint.id).where(overdue, Complaint.id > last_id).order_by(Complaint.id).limit(chunk_size)
         ).all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        in_chunk = Complaint.id.in_(ids) & overdue
+
+        db.session.execute(insert(ComplaintHistory).from_select(
+            ['complaint_id', 'date_changed', 'old_status', 'new_status', 'notes', 'changed_by'],
+            select(Complaint.id, literal(now), Complaint.status, literal(ESCALATED), literal(notes), null())
+            .where(in_chunk),
+        ))
+        result = db.session.execute(
+            update(Complaint).where(in_chunk).values(status=ESCALATED).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        escalated += result.rowcount
+        chunks += 1
+    return escalated, chunks
+
+
+def auto_escalate_complaints(app, now=None):
+    """Escalate open complaints older than their priority's threshold.
+
+    Thresholds come from ``ESCALATION_THRESHOLD_HOURS`` (priority -> hours,
+    with a ``'default'`` entry for anything else). Returns a report dict with
+    the number of rows escalated, chunks committed and elapsed seconds.
+    """
+    with job_context(app):
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        thresholds = dict(app.config['ESCALATION_THRESHOLD_HOURS'])
+        default_hours = thresholds.pop('default')
+        chunk_size = app.config['ESCALATION_CHUNK_SIZE']
+
+        is_open = (Complaint.is_deleted == False) & Complaint.status.notin_(CLOSED_STATUSES)
+        passes = [(Complaint.priority == priority, hours, priority) for priority, hours in thresholds.items()]
+        passes.append((Complaint.priority.notin_(list(thresholds)), default_hours, 'other'))
+
+        escalated = chunks = 0
+        for priority_match, hours, label in passes:
+            overdue = is_open & priority_match & (Complaint.date_posted <= now - timedelta(hours=hours))
+            notes = f'System auto-escalation ({label} priority open > {hours}h).'
+            rows, batches = _escalate_chunks(overdue, notes, now, chunk_size)
+            escalated += rows
+            chunks += batches
+
+        if escalated:
+            from app.analytics import invalidate_dashboard_stats
+            invalidate_dashboard_stats()
+
+        report = {'escalated': escalated, 'chunks': chunks,
+                  'seconds': round(time.perf_counter() - started, 3)}
+        logger.info('Auto-escalation: %(escalated)d complaint(s) in %(chunks)d chunk(s), %(seconds).3fs', report)
+        return report
+
+
+class Scheduler:
+    """Interval job runner with single-runner election across processes."""
+
+    def __init__(self, app, lock_path, poll_seconds=30):
+        self.app = app
+        self.lock_path = lock_path
+        self.poll_seconds = poll_seconds
+        self.jobs = {}
+        self._lock_file = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_job(self, func, id, seconds, args=(), replace_existing=True):
+        if id in self.jobs and not replace_existing:
+            raise ValueError(f'Job {id!r} already scheduled')
+        self.jobs[id] = {'func': func, 'args': args, 'seconds': seconds, 'next_run': 0.0}
+
+    @property
+    def is_leader(self):
+        return self._lock_file is not None
+
+    def _try_lead(self):
+        if self._lock_file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info('Scheduler leadership acquired by pid %d', os.getpid())
+        return True
+
+    def run_pending(self):
+        """Run every due job once; returns the ids that ran."""
+        if not self._try_lead():
+            return []
+        ran = []
+        for job_id, job in self.jobs.items():
+            if time.monotonic() < job['next_run']:
+                continue
+            started, failed = time.perf_counter(), False
+            try:
+                job['func'](*job['args'])
+            except Exception:
+                failed = True
+                logger.exception('Scheduled job %s failed', job_id)
+            observe_job(job_id, time.perf_counter() - started, failed)
+            job['next_run'] = time.monotonic() + job['seconds']
+            ran.append(job_id)
+        return ran
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='campussync-scheduler', daemon=True)
+            self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
 
-        for c in pending_complaints:
-            old_status = c.status
-            c.status = 'Escalated'
-            history = ComplaintHistory(
-                complaint_id=c.id,
-                old_status=old_status,
-                new_status='Escalated',
-                notes='System auto-escalation (> 3 days).',
-                changed_by=None
-            )
-            app.db.session.add(history)
-        app.db.session.commit()
 
 def schedule_escalation(app, scheduler):
-    """Schedule auto-escalation to run daily."""
+    """Schedule auto-escalation at ESCALATION_INTERVAL_SECONDS."""
     scheduler.add_job(
         func=auto_escalate_complaints,
         args=[app],
-        trigger="interval",
-        hours=24,
+        seconds=app.config['ESCALATION_INTERVAL_SECONDS'],
         id='escalation_job',
         replace_existing=True
-    )
\ No newline at end of file
+    )
+
+
+def run_sqlite_maintenance(app):
+    """Checkpoint the WAL and refresh planner statistics (see app/database.py)."""
+    from app.database import sqlite_maintenance
+    with job_context(app):
+        if db.engine.dialect.name != 'sqlite':
+            return None
+        report = sqlite_maintenance()
+        logger.info('SQLite maintenance: checkpointed %(checkpointed)d of %(wal_pages)d WAL page(s), busy=%(busy)d',
+                    report)
+        return report
+
+
+def schedule_sqlite_maintenance(app, scheduler):
+    """Schedule SQLite maintenance at SQLITE_MAINTENANCE_INTERVAL_SECONDS."""
+    scheduler.add_job(
+        func=run_sqlite_maintenance,
+        args=[app],
+        seconds=app.config['SQLITE_MAINTENANCE_INTERVAL_SECONDS'],
+        id='sqlite_maintenance_job',
+        replace_existing=True
+    )
+
+
+def init_scheduler(app):
+    """Start the background scheduler when SCHEDULER_ENABLED is set."""
+    if not app.config.get('SCHEDULER_ENABLED'):
+        return None
+    scheduler = Scheduler(app, app.config['SCHEDULER_LOCK_FILE'])
+    schedule_escalation(app, scheduler)
+    schedule_sqlite_maintenance(app, scheduler)
+    app.extensions['scheduler'] = scheduler
+    scheduler.start()
+    return scheduler
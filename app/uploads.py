@@ -0,0 +1,248 @@
+"""Image upload pipeline.
+
+Uploads are streamed to a temporary file under ``UPLOAD_MAX_BYTES`` while
+being hashed, verified to really be a PNG/JPEG with Pillow, and stored
+content-addressed as ``<sha256>.<ext>`` so identical photos share one
+file. Downscaled ``thumb`` and ``web`` JPEG variants are produced by a
+small background thread pool and live in ``UPLOAD_FOLDER/variants``.
+
+Because stored files never change, they are served with a year-long
+``immutable`` cache lifetime, strong ETags, ``304``/Range support and,
+optionally, handed off to the fronting web server (``X-Accel-Redirect``
+for nginx, ``X-Sendfile`` for Apache/lighttpd).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import mimetypes
+from flask import abort, current_app, request, url_for
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app import db
+from app.models import Complaint
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png'}
+# Longest edge in pixels for each generated variant
+VARIANTS = {'thumb': 320, 'web': 1280}
+VARIANT_DIR = 'variants'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class UploadRejected(Exception):
+    """The uploaded file is too large or not an acceptable image."""
+
+
+def variant_name(filename, variant):
+    stem = os.path.splitext(filename)[0]
+    return f'{stem}.{variant}.jpg'
+
+
+def variant_path(upload_folder, filename, variant):
+    return os.path.join(upload_folder, VARIANT_DIR, variant_name(filename, variant))
+
+
+def _validate_image(path):
+    config = current_app.config
+    try:
+        with Image.open(path) as img:
+            image_format = img.format
+            width, height = img.size
+            img.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise UploadRejected('The uploaded file is not a valid image.')
+
+    extension = FORMAT_EXTENSIONS.get(image_format)
+    if extension is None or extension not in config.get('ALLOWED_EXTENSIONS', set()):
+        raise UploadRejected('Only PNG and JPEG images are allowed.')
+    if width * height > config['IMAGE_MAX_PIXELS']:
+        raise UploadRejected('The uploaded image dimensions are too large.')
+    return extension
+
+
+def store_upload(file_storage):
+    """Stream an upload to disk and return its content-addressed filename.
+
+    Raises UploadRejected when the file exceeds ``UPLOAD_MAX_BYTES`` or is
+    not a real PNG/JPEG image; nothing is left on disk in that case.
+    """
+    config = current_app.config
+    upload_folder = config['UPLOAD_FOLDER']
+    limit = config.get('UPLOAD_MAX_BYTES')
+    os.makedirs(upload_folder, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, prefix='.upload-')
+    try:
+        size = 0
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if limit and size > limit:
+                    raise UploadRejected(f'Images must be smaller than {limit // (1024 * 1024)} MB.')
+                digest.update(chunk)
+                out.write(chunk)
+
+        extension = _validate_image(tmp_path)
+        filename = f'{digest.hexdigest()}.{extension}'
+        final_path = os.path.join(upload_folder, filename)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)  # Same content already stored
+        else:
+            os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    schedule_variants(filename)
+    return filename
+
+
+def generate_variants(upload_folder, filename, quality=82):
+    """Write the thumb/web JPEG variants of one stored image if missing."""
+    targets = {variant: variant_path(upload_folder, filename, variant) for variant in VARIANTS}
+    missing = {variant: path for variant, path in targets.items() if not os.path.exists(path)}
+    if not missing:
+        return []
+    os.makedirs(os.path.join(upload_folder, VARIANT_DIR), exist_ok=True)
+
+    with Image.open(os.path.join(upload_folder, filename)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        for variant, path in missing.items():
+            size = VARIANTS[variant]
+            copy = img.copy()
+            copy.thumbnail((size, size), Image.LANCZOS)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.variant-')
+            with os.fdopen(fd, 'wb') as out:
+                copy.save(out, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+    return list(missing)
+
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-variants')
+        return _executor
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Image variant generation failed: %s', error)
+
+
+def schedule_variants(filename):
+    """Generate variants in the background (inline when IMAGE_PROCESSING_SYNC)."""
+    config = current_app.config
+    args = (config['UPLOAD_FOLDER'], filename, config['IMAGE_VARIANT_QUALITY'])
+    if config.get('IMAGE_PROCESSING_SYNC'):
+        generate_variants(*args)
+        return
+    future = _get_executor(config['IMAGE_VARIANT_WORKERS']).submit(generate_variants, *args)
+    future.add_done_callback(_log_failure)
+
+
+def _cacheable(response):
+    response.cache_control.public = False
+    response.cache_control.private = True  # Uploads sit behind login_required
+    response.cache_control.max_age = current_app.config['UPLOAD_CACHE_MAX_AGE']
+    response.cache_control.immutable = True
+    return response
+
+
+def send_upload(relative_path):
+    """Serve a stored upload with immutable caching and conditional GET.
+
+    ``relative_path`` is relative to ``UPLOAD_FOLDER``. Content-addressed
+    names double as strong ETags. With ``UPLOAD_SENDFILE_MODE`` set, the
+    file body is left to the web server and the worker returns at once.
+    """
+    config = current_app.config
+    path = safe_join(config['UPLOAD_FOLDER'], relative_path)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    stem = os.path.basename(relative_path).split('.', 1)[0]
+    etag = os.path.basename(relative_path) if len(stem) == 64 else True
+    mode = config.get('UPLOAD_SENDFILE_MODE')
+
+    if mode == 'x-accel':
+        response = current_app.response_class(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        if isinstance(etag, str):
+            response.set_etag(etag)
+        response.headers['X-Accel-Redirect'] = config['UPLOAD_ACCEL_PREFIX'].rstrip('/') + '/' + relative_path
+        response.make_conditional(request)
+        return _cacheable(response)
+
+    response = send_file(path, request.environ, etag=etag, conditional=True,
+                         use_x_sendfile=(mode == 'x-sendfile'),
+                         response_class=current_app.response_class)
+    return _cacheable(response)
+
+
+def image_url(filename, variant=None):
+    """URL for an upload, preferring a generated variant when one exists."""
+    if variant and os.path.exists(variant_path(current_app.config['UPLOAD_FOLDER'], filename, variant)):
+        return url_for('student.uploaded_variant', variant=variant, filename=filename)
+    return url_for('student.uploaded_file', filename=filename)
+
+
+def referenced_images():
+    rows = db.session.query(Complaint.image_file).filter(Complaint.image_file.isnot(None)).distinct()
+    return {name for (name,) in rows}
+
+
+def sweep_orphans(grace_seconds=3600, dry_run=False):
+    """Delete uploads and variants no complaint references.
+
+    Soft-deleted complaints still count as references. Files younger than
+    ``grace_seconds`` are kept so in-flight uploads are not swept before
+    their complaint row is committed. Returns the removed paths.
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    if not os.path.isdir(upload_folder):
+        return []
+    referenced = referenced_images()
+    stems = {os.path.splitext(name)[0] for name in referenced}
+    cutoff = time.time() - grace_seconds
+
+    candidates = []
+    for entry in os.scandir(upload_folder):
+        if entry.is_file() and entry.name not in referenced:
+            candidates.append(entry)
+    variant_folder = os.path.join(upload_folder, VARIANT_DIR)
+    if os.path.isdir(variant_folder):
+        for entry in os.scandir(variant_folder):
+            if entry.is_file() and entry.name.split('.', 1)[0] not in stems:
+                candidates.append(entry)
+
+    removed = []
+    for entry in candidates:
+        if entry.stat().st_mtime < cutoff:
+            if not dry_run:
+                os.remove(entry.path)
+            removed.append(entry.path)
+    return removed
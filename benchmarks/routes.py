@@ -0,0 +1,292 @@
+"""Route benchmarks with a committed baseline and regression gates.
+
+Builds a synthetic dataset with ``seed_db.generate_dataset`` in a
+throwaway SQLite file, then drives the main pages through the Flask test
+client as the matching role. For every route it records p50/p95 latency,
+the number of SQL statements and the number of rows fetched per request,
+and compares them with ``benchmarks/baseline.json``:
+
+- statements may not exceed the baseline at all,
+- rows fetched may grow by at most ``--rows-tolerance`` (default 10%),
+- p50/p95 are compared relative to the host: both runs time a fixed
+  calibration workload, the baseline latencies are scaled by the ratio,
+  and may then grow by at most ``--latency-tolerance`` (default 100%,
+  ``BENCH_LATENCY_TOLERANCE``) plus ``--latency-slack-ms`` (default 2,
+  ``BENCH_LATENCY_SLACK_MS``). ``BENCH_LATENCY_GATE=off`` reports latency
+  without failing on it, for noisy CI hosts.
+
+Statement and row counts are deterministic for a given dataset and are
+the primary gate; latency only catches gross slowdowns.
+
+Page and fragment caches are disabled so every request does its real
+work. Run from the project root; exits non-zero on a regression:
+
+    python benchmarks/routes.py                    # compare with the baseline
+    python benchmarks/routes.py --update-baseline  # after an intended change
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func, select  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Comment, Complaint, User  # noqa: E402
+from config import Config  # noqa: E402
+from seed_db import generate_dataset  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DATASET = {'users': 2000, 'complaints': 50000, 'upvotes': 200000, 'comments': 100000, 'seed': 42}
+# Fixed clock so the age-dependent statuses are identical on every run
+DATASET_NOW = datetime(2026, 1, 1)
+
+
+class _Counter:
+    statements = 0
+    rows = 0
+
+
+class _CountingCursor(sqlite3.Cursor):
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _Counter.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        _Counter.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        _Counter.rows += len(rows)
+        return rows
+
+
+class _CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _Counter.statements += 1
+
+
+def _calibration_pass():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, grp INTEGER, label TEXT)')
+    conn.executemany('INSERT INTO t (grp, label) VALUES (?, ?)',
+                     ((i % 97, f'label {i * 7919 % 10007}') for i in range(20000)))
+    for _ in range(5):
+        conn.execute('SELECT grp, COUNT(*), MAX(label) FROM t GROUP BY grp').fetchall()
+        rows = conn.execute('SELECT id, label FROM t ORDER BY label LIMIT 2000').fetchall()
+        ''.join(f'<tr><td>{row[0]}</td><td>{row[1]}</td></tr>' for row in rows)
+    conn.close()
+
+
+def calibrate(repeat=5):
+    """Median time (ms) of a fixed SQLite + Python workload, for host-relative latency gates."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _calibration_pass()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def _make_app(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+        SQLALCHEMY_ENGINE_OPTIONS = dict(Config.SQLALCHEMY_ENGINE_OPTIONS,
+                                         connect_args={'factory': _CountingConnection})
+        WTF_CSRF_ENABLED = False
+        SCHEDULER_ENABLED = False
+        PAGE_CACHE_BACKEND = None
+        DATA_VERSION_FILE = None
+        FRAGMENT_CACHE_ENABLED = False
+        PASSWORD_HASH_SYNC = True
+        BCRYPT_LOG_ROUNDS = 4
+    app = create_app(BenchConfig)
+    with app.app_context():
+        for engine in (db.engine, app.extensions.get('read_engine')):
+            if engine is not None:
+                event.listen(engine, 'before_cursor_execute', _count_statement)
+    return app
+
+
+def _busiest(column, where=None):
+    query = select(column).select_from(Complaint).where(Complaint.is_deleted == False)
+    if where is not None:
+        query = query.where(where)
+    return db.session.execute(query.group_by(column).order_by(func.count().desc()).limit(1)).scalar()
+
+
+def _fixtures():
+    """Pick the heaviest realistic subjects: the busiest student, staff member and thread."""
+    student = _busiest(Complaint.user_id)
+    staff = _busiest(Complaint.assigned_to, Complaint.assigned_to.isnot(None))
+    admin = User(username='bench_admin', email='bench_admin@asmedu.org', password='x', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    thread = db.session.execute(
+        select(Comment.complaint_id).join(Complaint, Complaint.id == Comment.complaint_id)
+        .where(Complaint.is_deleted == False)
+        .group_by(Comment.complaint_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    popular = db.session.execute(
+        select(Complaint.id).where(Complaint.is_deleted == False, Complaint.id != thread)
+        .order_by(Complaint.upvote_count.desc()).limit(1)
+    ).scalar()
+    return {'student': student, 'staff': staff, 'admin': admin.id, 'thread': thread, 'popular': popular}
+
+
+def routes(fixtures):
+    """``(name, role, method, url, form)`` for every benchmarked route."""
+    return [
+        ('student.feed', 'student', 'GET', '/feed', None),
+        ('student.dashboard', 'student', 'GET', '/dashboard', None),
+        ('admin.dashboard', 'admin', 'GET', '/admin/dashboard', None),
+        ('staff.dashboard', 'staff', 'GET', '/staff/dashboard', None),
+        ('student.view_complaint', 'student', 'GET', f"/complaint/{fixtures['thread']}", None),
+        ('student.upvote', 'student', 'POST', f"/upvote/{fixtures['popular']}", None),
+        ('student.post_comment', 'student', 'POST', f"/complaint/{fixtures['popular']}/comment",
+         {'body': 'Benchmark comment'}),
+    ]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _measure(client, method, url, form, requests, warmup):
+    latencies, statements, rows = [], [], []
+    for index in range(warmup + requests):
+        _Counter.statements = _Counter.rows = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=form)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {url} returned {response.status_code}')
+        if index >= warmup:
+            latencies.append(elapsed * 1000)
+            statements.append(_Counter.statements)
+            rows.append(_Counter.rows)
+    latencies.sort()
+    return {
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'statements': max(statements),
+        'rows': max(rows),
+    }
+
+
+def run(dataset=None, requests=30, warmup=3):
+    """Build the dataset and benchmark every route; returns the results dict."""
+    dataset = dict(DATASET, **(dataset or {}))
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            generate_dataset(dataset['users'], dataset['complaints'], dataset['upvotes'],
+                             dataset['comments'], seed=dataset['seed'], now=DATASET_NOW)
+            fixtures = _fixtures()
+            db.session.remove()
+
+        results = {}
+        for name, role, method, url, form in routes(fixtures):
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(fixtures[role])
+                sess['_fresh'] = True
+            results[name] = _measure(client, method, url, form, requests, warmup)
+
+        with app.app_context():
+            db.engine.dispose()
+            if app.extensions.get('read_engine') is not None:
+                app.extensions['read_engine'].dispose()
+    return {'dataset': dataset, 'calibration_ms': calibrate(), 'routes': results}
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def compare(baseline, current, latency_tolerance=1.0, latency_slack_ms=2.0, rows_tolerance=0.1,
+            latency_gate=True):
+    """Return a list of human-readable regressions (empty when within limits).
+
+    Baseline latencies are scaled by ``current / baseline`` calibration time
+    when both results carry one, so a slower host doesn't fail by itself.
+    """
+    if baseline.get('dataset') != current['dataset']:
+        return [f"dataset {current['dataset']} does not match the baseline's {baseline.get('dataset')}"]
+    scale = 1.0
+    if baseline.get('calibration_ms') and current.get('calibration_ms'):
+        scale = current['calibration_ms'] / baseline['calibration_ms']
+    problems = []
+    for name, now in current['routes'].items():
+        before = baseline['routes'].get(name)
+        if before is None:
+            problems.append(f'{name}: no baseline entry (run with --update-baseline)')
+            continue
+        if now['statements'] > before['statements']:
+            problems.append(f"{name}: {now['statements']} SQL statements, baseline {before['statements']}")
+        if now['rows'] > before['rows'] * (1 + rows_tolerance):
+            problems.append(f"{name}: {now['rows']} rows fetched, baseline {before['rows']}")
+        if not latency_gate:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            limit = before[key] * scale * (1 + latency_tolerance) + latency_slack_ms
+            if now[key] > limit:
+                problems.append(f'{name}: {key} {now[key]} exceeds {limit:.2f} '
+                                f'(baseline {before[key]}, host scale {scale:.2f})')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=30, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured requests per route')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=_env_float('BENCH_LATENCY_TOLERANCE', 1.0),
+                        help='allowed growth over the host-scaled baseline (1.0 = twice as slow)')
+    parser.add_argument('--latency-slack-ms', type=float, default=_env_float('BENCH_LATENCY_SLACK_MS', 2.0))
+    parser.add_argument('--rows-tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    current = run(requests=args.requests, warmup=args.warmup)
+    print(f"{'calibration':>24}: {current['calibration_ms']} ms")
+    for name, result in current['routes'].items():
+        print(f'{name:>24}: ' + ', '.join(f'{key}={value}' for key, value in result.items()))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    latency_gate = os.environ.get('BENCH_LATENCY_GATE', 'on').lower() not in ('0', 'false', 'off')
+    problems = compare(baseline, current, args.latency_tolerance, args.latency_slack_ms, args.rows_tolerance,
+                       latency_gate)
+    for problem in problems:
+        print(f'REGRESSION {problem}')
+    if not problems:
+        print('All routes within the baseline.')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Compare SQLite write throughput and read latency with the engine profile on and off.
+
+Writer threads bump upvote counters and post comments while reader threads run
+the feed query, each through the app's own engine and connection pool,
+against a throwaway database file. Run from the project root:
+
+    python benchmarks/sqlite_concurrency.py --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Comment, Complaint, User  # noqa: E402
+from app.pagination import keyset_paginate  # noqa: E402
+from app.queries import MOST_UPVOTED, live_complaints  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def _make_app(path, profile):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+        SQLITE_PRAGMAS = Config.SQLITE_PRAGMAS if profile else {}
+        SQLALCHEMY_ENGINE_OPTIONS = Config.SQLALCHEMY_ENGINE_OPTIONS if profile else {}
+        SCHEDULER_ENABLED = False
+        # Keep the project's shared data version and page cache out of it
+        DATA_VERSION_FILE = None
+        PAGE_CACHE_BACKEND = None
+    return create_app(BenchConfig)
+
+
+def _seed(app, users, complaints):
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(User(username=f'user{i}', email=f'user{i}@asmedu.org', password='x')
+                           for i in range(users))
+        db.session.flush()
+        db.session.add_all(Complaint(title=f'Complaint {i}', category='Other', description='Benchmark',
+                                     location='Campus', user_id=1 + i % users) for i in range(complaints))
+        db.session.commit()
+
+
+def _writer(app, stop, index, complaints, counts):
+    done = locked = 0
+    with app.app_context():
+        while not stop.is_set():
+            complaint_id = 1 + (index * 7919 + done) % complaints
+            try:
+                Complaint.query.filter_by(id=complaint_id).update(
+                    {Complaint.upvote_count: Complaint.upvote_count + 1}, synchronize_session=False)
+                db.session.add(Comment(body='Same here', author_id=1 + index, complaint_id=complaint_id))
+                db.session.commit()
+                done += 1
+            except OperationalError:
+                db.session.rollback()
+                locked += 1
+        db.session.remove()
+    counts.append((done, locked))
+
+
+def _reader(app, stop, latencies, errors):
+    with app.app_context():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                keyset_paginate(live_complaints(), MOST_UPVOTED, 10)
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                errors.append(1)
+            db.session.remove()
+
+
+def run(profile, writers, readers, seconds, users=50, complaints=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_app(os.path.join(tmp, 'bench.db'), profile)
+        _seed(app, max(users, writers + 1), complaints)
+        stop = threading.Event()
+        counts, latencies, read_errors = [], [], []
+        threads = [threading.Thread(target=_writer, args=(app, stop, i, complaints, counts)) for i in range(writers)]
+        threads += [threading.Thread(target=_reader, args=(app, stop, latencies, read_errors)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+
+    writes = sum(done for done, _ in counts)
+    latencies.sort()
+    return {
+        'writes_per_second': round(writes / seconds, 1),
+        'write_errors': sum(locked for _, locked in counts),
+        'reads': len(latencies),
+        'read_errors': len(read_errors),
+        'read_p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'read_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    for label, profile in (('default', False), ('production', True)):
+        result = run(profile, args.writers, args.readers, args.seconds)
+        print(f'{label:>10}: ' + ', '.join(f'{key}={value}' for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,11 +9,44 @@ class Config:
     # Database: Simple SQLite setup
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'instance', 'campussync.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite allows one writer at a time, so a small pool per worker is enough;
+    # size it to the gunicorn threads per worker.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': 30,
+    }
+    # Read engine for @read_only views (app/routing.py); defaults to a
+    # read-only connection to the SQLite file above.
+    SQLALCHEMY_READ_URI = os.environ.get('DATABASE_READ_URL') or None
+    # Applied to every new connection (app/database.py); SQLITE_PROFILE=off
+    # keeps SQLite's defaults. Order matters: busy_timeout before journal_mode.
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,             # ms a writer waits for the lock
+        'journal_mode': 'WAL',            # readers don't block on the writer
+        'synchronous': 'NORMAL',          # safe with WAL, far fewer fsyncs
+        'cache_size': -32000,             # 32 MB page cache per connection
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    } if os.environ.get('SQLITE_PROFILE', 'production') != 'off' else {}
+    SQLITE_MAINTENANCE_INTERVAL_SECONDS = int(os.environ.get('SQLITE_MAINTENANCE_INTERVAL_SECONDS', 6 * 3600))
 
     # File uploads
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
-    # Removed MAX_CONTENT_LENGTH to disable size limit
+    UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+    # Whole-request cap; leaves headroom for the other form fields
+    MAX_CONTENT_LENGTH = UPLOAD_MAX_BYTES + 1024 * 1024
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+    IMAGE_MAX_PIXELS = 40_000_000
+    IMAGE_VARIANT_QUALITY = 82
+    IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+    IMAGE_PROCESSING_SYNC = False  # Generate thumbnails inline instead of in the background
+    # Stored uploads never change, so browsers may keep them for a year
+    UPLOAD_CACHE_MAX_AGE = 365 * 24 * 3600
+    # None (serve from Python), 'x-accel' (nginx) or 'x-sendfile' (Apache/lighttpd)
+    UPLOAD_SENDFILE_MODE = os.environ.get('UPLOAD_SENDFILE_MODE') or None
+    # nginx 'internal' location that aliases UPLOAD_FOLDER
+    UPLOAD_ACCEL_PREFIX = os.environ.get('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
 
     # CSRF Protection
     WTF_CSRF_ENABLED = True
@@ -26,6 +59,94 @@ class Config:
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
 
+    # Password hashing: bcrypt cost and the per-worker process pool (app/passwords.py)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+    PASSWORD_HASH_TIMEOUT = 10  # Seconds to wait for a queued hash before giving up
+    PASSWORD_HASH_SYNC = False  # Hash inline instead of in the process pool
+
     # Email domain restriction for ASM CSIT
     ALLOWED_EMAIL_DOMAIN = 'asmedu.org'
 
+    # Logged-in user identity cache (entries, seconds; see app/identity.py)
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 1024))
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 300))
+
+    # Admin dashboard analytics cache lifetime (seconds)
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 60))
+    # Days shown in the admin trend charts (a term)
+    ANALYTICS_TREND_DAYS = 90
+
+    # Complaint list page cache (app/cache.py): 'memory', 'disk' or '' to disable.
+    # The data version file is shared by all workers so any write invalidates.
+    PAGE_CACHE_BACKEND = os.environ.get('PAGE_CACHE_BACKEND', 'memory')
+    PAGE_CACHE_DIR = os.path.join(basedir, 'instance', 'page_cache')
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 512))
+    DATA_VERSION_FILE = os.path.join(basedir, 'instance', 'data_version')
+
+    # Rendered complaint card/row fragments (app/fragments.py)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+    # Automatic assignment of new complaints (app/assignment.py): category ->
+    # staff usernames; other categories go to all staff.
+    AUTO_ASSIGN_ENABLED = os.environ.get('AUTO_ASSIGN', 'on').lower() not in ('0', 'false', 'off')
+    ASSIGNMENT_POOLS = {}
+
+    # Most complaints one admin bulk action may target
+    BULK_MAX_IDS = 1000
+    # Rows fetched (and written) per chunk by the streaming export
+    EXPORT_CHUNK_SIZE = 1000
+
+    # Auto-escalation of overdue open complaints (hours open, by priority)
+    ESCALATION_THRESHOLD_HOURS = {'High': 48, 'Medium': 72, 'Low': 120, 'default': 72}
+    ESCALATION_CHUNK_SIZE = 500
+    ESCALATION_INTERVAL_SECONDS = int(os.environ.get('ESCALATION_INTERVAL_SECONDS', 3600))
+
+    # In-process scheduler; the worker holding the lock file runs the jobs
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '').lower() in ('1', 'true', 'yes')
+    SCHEDULER_LOCK_FILE = os.path.join(basedir, 'instance', 'scheduler.lock')
+
+    # Maximum SQL statements per request for list views (see app/queries.py)
+    QUERY_BUDGET_ENFORCED = False
+    QUERY_BUDGET_DEFAULT = None
+    QUERY_BUDGETS = {
+        'admin.dashboard': 6,
+        'staff.dashboard': 3,
+        'student.dashboard': 3,
+        'student.feed': 4,
+        'student.view_complaint': 5,
+    }
+
+    # Request profiling (app/profiling.py): on for every request, or per
+    # request for admins sending PROFILING_HEADER (e.g. X-Profile). With
+    # neither set, nothing is registered.
+    PROFILING_ENABLED = os.environ.get('PROFILING', '').lower() in ('1', 'true', 'on')
+    PROFILING_HEADER = os.environ.get('PROFILING_HEADER') or None
+    PROFILING_SLOW_QUERY_MS = float(os.environ.get('PROFILING_SLOW_QUERY_MS', 100))
+    # Fraction of profiled requests run under cProfile; captures slower than
+    # the threshold are written to PROFILING_DIR
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.05))
+    PROFILING_CAPTURE_THRESHOLD_MS = float(os.environ.get('PROFILING_CAPTURE_THRESHOLD_MS', 500))
+    PROFILING_DIR = os.path.join(basedir, 'instance', 'profiles')
+
+    # Prometheus metrics at /metrics (app/metrics.py); gunicorn.conf.py sets
+    # PROMETHEUS_MULTIPROC_DIR so every worker's samples are aggregated
+    METRICS_ENABLED = os.environ.get('METRICS', 'on').lower() not in ('0', 'false', 'off')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # In-memory databases use a single static connection
+    WTF_CSRF_ENABLED = False  # Disable CSRF for testing
+    QUERY_BUDGET_ENFORCED = True
+    IMAGE_PROCESSING_SYNC = True
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_SYNC = True
+    DATA_VERSION_FILE = None  # In-process counter
+    FRAGMENT_CACHE_ENABLED = False
+    AUTO_ASSIGN_ENABLED = False  # Complaints stay Pending unless a test opts in
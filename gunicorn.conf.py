@@ -0,0 +1,22 @@
+"""Gunicorn settings.
+
+/metrics (app/metrics.py) aggregates samples from every worker through
+prometheus_client's multiprocess mode. That needs a shared directory set
+in the environment before the app is imported, emptied on each start,
+and told when a worker exits.
+"""
+import os
+import shutil
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(basedir, 'instance', 'prometheus'))
+
+
+def on_starting(server):
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,38 @@
+"""Add denormalized upvote_count to complaint
+
+Revision ID: 3b7e9d2a41c5
+Revises: cf043a11cb11
+Create Date: 2026-10-18 09:12:04.118233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e9d2a41c5'
+down_revision = 'cf043a11cb11'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('upvote_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing upvote rows
+    op.execute(
+        "UPDATE complaint SET upvote_count = "
+        "(SELECT COUNT(*) FROM upvote WHERE upvote.complaint_id = complaint.id)"
+    )
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.create_index('ix_complaint_feed_rank',
+                              ['is_deleted', sa.text('upvote_count DESC'), sa.text('date_posted DESC')],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.drop_index('ix_complaint_feed_rank')
+        batch_op.drop_column('upvote_count')
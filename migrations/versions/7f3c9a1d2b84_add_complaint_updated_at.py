@@ -0,0 +1,28 @@
+"""Add complaint.updated_at for fragment cache keys
+
+Revision ID: 7f3c9a1d2b84
+Revises: e29b7c0d5a63
+Create Date: 2026-10-18 14:02:37.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c9a1d2b84'
+down_revision = 'e29b7c0d5a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE complaint SET updated_at = COALESCE(date_resolved, date_posted)")
+
+
+def downgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
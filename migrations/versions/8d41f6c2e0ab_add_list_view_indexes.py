@@ -0,0 +1,57 @@
+"""Add composite and partial indexes for list views
+
+Revision ID: 8d41f6c2e0ab
+Revises: 3b7e9d2a41c5
+Create Date: 2026-10-18 10:02:37.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f6c2e0ab'
+down_revision = '3b7e9d2a41c5'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('is_deleted = 0')
+
+COMPLAINT_INDEXES = [
+    ('ix_complaint_feed_rank', ['upvote_count', 'date_posted']),
+    ('ix_complaint_live_recent', ['date_posted']),
+    ('ix_complaint_live_author', ['user_id', 'date_posted']),
+    ('ix_complaint_live_assignee', ['assigned_to', 'date_posted']),
+    ('ix_complaint_live_status', ['status', 'date_posted']),
+    ('ix_complaint_live_category', ['category', 'date_posted']),
+    ('ix_complaint_live_status_rank', ['status', 'upvote_count', 'date_posted']),
+    ('ix_complaint_live_category_rank', ['category', 'upvote_count', 'date_posted']),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        # Replaced by a partial index without the leading is_deleted column
+        batch_op.drop_index('ix_complaint_feed_rank')
+
+    for name, columns in COMPLAINT_INDEXES:
+        op.create_index(name, 'complaint', columns, unique=False,
+                        sqlite_where=LIVE, postgresql_where=LIVE)
+
+    op.create_index(op.f('ix_upvote_complaint_id'), 'upvote', ['complaint_id'], unique=False)
+    op.create_index('ix_comment_complaint_created', 'comment', ['complaint_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_user_role'), 'user', ['role'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_role'), table_name='user')
+    op.drop_index('ix_comment_complaint_created', table_name='comment')
+    op.drop_index(op.f('ix_upvote_complaint_id'), table_name='upvote')
+
+    for name, _ in reversed(COMPLAINT_INDEXES):
+        op.drop_index(name, table_name='complaint')
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.create_index('ix_complaint_feed_rank',
+                              ['is_deleted', sa.text('upvote_count DESC'), sa.text('date_posted DESC')],
+                              unique=False)
@@ -0,0 +1,38 @@
+"""Add complaint_daily_stat rollups for the admin trend charts
+
+Revision ID: a6d2f80c47e1
+Revises: 7f3c9a1d2b84
+Create Date: 2026-10-18 16:41:09.208334
+
+The maintenance triggers and the backfill are installed on the next
+start (``ensure_rollups`` in run.py) or by ``flask rebuild-rollups``,
+as for the search index.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f80c47e1'
+down_revision = '7f3c9a1d2b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('complaint_daily_stat',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.Column('backlog_delta', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key', 'day')
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS complaint_rollup_ai')
+    op.execute('DROP TRIGGER IF EXISTS complaint_rollup_ad')
+    op.execute('DROP TRIGGER IF EXISTS complaint_rollup_au')
+    op.drop_table('complaint_daily_stat')
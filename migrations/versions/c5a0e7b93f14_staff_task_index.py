@@ -0,0 +1,30 @@
+"""Index staff assignments by status for the task tabs
+
+Revision ID: c5a0e7b93f14
+Revises: 8d41f6c2e0ab
+Create Date: 2026-10-18 10:41:12.006315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a0e7b93f14'
+down_revision = '8d41f6c2e0ab'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('is_deleted = 0')
+
+
+def upgrade():
+    op.drop_index('ix_complaint_live_assignee', table_name='complaint')
+    op.create_index('ix_complaint_live_assignee', 'complaint', ['assigned_to', 'status', 'date_posted'],
+                    unique=False, sqlite_where=LIVE, postgresql_where=LIVE)
+
+
+def downgrade():
+    op.drop_index('ix_complaint_live_assignee', table_name='complaint')
+    op.create_index('ix_complaint_live_assignee', 'complaint', ['assigned_to', 'date_posted'],
+                    unique=False, sqlite_where=LIVE, postgresql_where=LIVE)
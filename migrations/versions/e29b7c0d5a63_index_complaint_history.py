@@ -0,0 +1,25 @@
+"""Index complaint history by complaint for the detail page
+
+Revision ID: e29b7c0d5a63
+Revises: c5a0e7b93f14
+Create Date: 2026-10-18 11:26:50.881407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e29b7c0d5a63'
+down_revision = 'c5a0e7b93f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_complaint_history_complaint_changed', 'complaint_history',
+                    ['complaint_id', 'date_changed'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_complaint_history_complaint_changed', table_name='complaint_history')
@@ -1,4 +1,6 @@
 from app import create_app, db
+from app.rollups import ensure_rollups
+from app.search import ensure_search_index
 
 app = create_app()
 
@@ -6,6 +8,10 @@ app = create_app()
 with app.app_context():
     db.create_all()
     print('Database tables created.')
+    if ensure_search_index():
+        print('Search index built.')
+    if ensure_rollups():
+        print('Complaint rollups built.')
 
 if __name__ == '__main__':
     # Development server
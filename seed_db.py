@@ -1,31 +1,79 @@
+"""Seed the database with demo accounts and, optionally, synthetic load.
+
+    python seed_db.py                                   # demo data only
+    python seed_db.py --users 20000 --complaints 500000 \\
+        --upvotes 2000000 --comments 1000000 --seed 42   # plus a benchmark set
+
+The demo users and complaints are only created when the demo admin does
+not exist yet, so the script can be re-run against an existing database.
+Generated rows are appended after the current maximum ids and inserted
+with Core ``executemany`` in batches; every generated account shares a
+single precomputed password hash (``student123``). The same ``--seed``
+against the same starting database yields the same data.
+
+Skew follows what production looks like: a few categories dominate,
+complaint dates lean towards the recent past, status depends on age
+(old complaints are mostly resolved), a handful of students post most
+complaints, and upvotes and comments follow a Zipf-like popularity curve.
+"""
+import argparse
 import os
-from app import create_app, db, bcrypt
-from app.models import User, Complaint
+import random
+import time
 from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from app import create_app, db
+from app.analytics import invalidate_dashboard_stats
+from app.cache import bump_data_version
+from app.models import Comment, Complaint, Upvote, User
+from app.passwords import hash_password, shutdown_executor
+from app.rollups import rollups_suspended
+from app.search import search_index_suspended
 
-# Ensure instance folder exists
-os.makedirs(os.path.join(os.path.abspath(os.path.dirname(__file__)), 'instance'), exist_ok=True)
-os.makedirs(os.path.join(os.path.abspath(os.path.dirname(__file__)), 'uploads'), exist_ok=True)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-app = create_app()
+CATEGORY_WEIGHTS = {
+    'Wi-Fi / Internet': 22, 'Classrooms': 14, 'Computer Labs': 12, 'Hostel': 12, 'Canteen': 10,
+    'Washrooms': 9, 'Electricity': 8, 'Library': 6, 'Sports Facilities': 4, 'Other': 3,
+}
+PRIORITY_WEIGHTS = {'Low': 50, 'Medium': 35, 'High': 15}
+# (max age in days, {status: weight}); older complaints are mostly closed
+STATUS_BY_AGE = (
+    (2, {'Pending': 70, 'In Progress': 25, 'Resolved': 5}),
+    (14, {'Pending': 30, 'In Progress': 35, 'Resolved': 30, 'Escalated': 5}),
+    (None, {'Pending': 8, 'In Progress': 12, 'Resolved': 75, 'Escalated': 5}),
+)
+ISSUES = {
+    'Wi-Fi / Internet': ('Wi-Fi keeps dropping', 'No internet connection', 'Very slow Wi-Fi', 'Cannot log in to campus Wi-Fi'),
+    'Classrooms': ('Projector not working', 'Broken chairs', 'Air conditioning broken', 'Whiteboard markers missing'),
+    'Computer Labs': ('PC will not boot', 'Missing keyboard keys', 'Software licence expired', 'Printer jammed'),
+    'Hostel': ('No hot water', 'Broken window latch', 'Power outage', 'Leaking ceiling'),
+    'Canteen': ('Stale food served', 'Long queues at lunch', 'Dirty tables', 'Water dispenser empty'),
+    'Washrooms': ('Tap leaking', 'No soap available', 'Flush not working', 'Lights out'),
+    'Electricity': ('Flickering lights', 'Sockets not working', 'Frequent power cuts', 'Exposed wiring'),
+    'Library': ('Broken chairs', 'Too noisy to study', 'Book return slot jammed', 'Lights too dim'),
+    'Sports Facilities': ('Torn basketball net', 'Gym equipment broken', 'Court flooded', 'Changing room locked'),
+    'Other': ('Stray dogs near parking', 'Broken bench', 'Overflowing bins', 'Lost and found closed'),
+}
+LOCATIONS = ('Main Library', 'Building A', 'Building B', 'Engineering Block', 'Arts Block', 'CS Lab 4',
+             'Hostel A', 'Hostel B', 'Main Canteen', 'Outdoor Courts', 'Student Parking Lot', 'Admin Block')
+COMMENTS = ('Same problem here.', 'Still happening today.', 'This has been going on for a week.',
+            'Reported this at the front desk too.', 'Any update on this?', 'Looking into it.',
+            'A technician has been scheduled.', 'Thanks, this is fixed now.')
 
-with app.app_context():
-    # Create database tables
-    db.create_all()
-    print("Database tables created.")
 
-    # Create demo users with @asmedu.org emails
-    admin_pw = bcrypt.generate_password_hash('admin123').decode('utf-8')
-    admin_user = User(username='admin', email='admin@asmedu.org', password=admin_pw, role='admin')
+def seed_demo():
+    """Create the demo accounts and complaints unless they already exist."""
+    if db.session.execute(select(User.id).filter_by(email='admin@asmedu.org')).first():
+        print("Demo data already present, skipping.")
+        return False
 
-    staff_pw = bcrypt.generate_password_hash('staff123').decode('utf-8')
+    admin_pw, staff_pw, student_pw = (hash_password(pw) for pw in ('admin123', 'staff123', 'student123'))
+    admin_user = User(username='admin', email='admin@asmedu.org', password=admin_pw, role='admin')
     staff1 = User(username='it_support', email='it.support@asmedu.org', password=staff_pw, role='staff')
     staff2 = User(username='maintenance', email='maintenance@asmedu.org', password=staff_pw, role='staff')
-
-    student_pw = bcrypt.generate_password_hash('student123').decode('utf-8')
     student1 = User(username='alice', email='alice.cs@asmedu.org', password=student_pw, role='student')
     student2 = User(username='bob', email='bob.ee@asmedu.org', password=student_pw, role='student')
-
     db.session.add_all([admin_user, staff1, staff2, student1, student2])
     db.session.commit()
     print("Created demo users:")
@@ -33,7 +81,6 @@ with app.app_context():
     print("- Staff: it.support@asmedu.org / staff123")
     print("- Student: alice.cs@asmedu.org / student123")
 
-    # Hardcode 10 complaints
     now = datetime.utcnow()
     complaints = [
         Complaint(title='Wi-Fi is extremely slow in main library', category='Wi-Fi / Internet', description='The wireless signal on the 2nd floor of the library drops constantly. Cannot study.', priority='High', location='Main Library 2nd Floor', status='Pending', user_id=student1.id, date_posted=now - timedelta(days=2)),
@@ -47,8 +94,225 @@ with app.app_context():
         Complaint(title='Fluorescent light flickering', category='Electricity', description='Light above my desk is flickering rapidly, giving me headaches.', priority='Low', location='Room 105, Arts Block', status='Pending', user_id=student1.id, date_posted=now - timedelta(hours=10)),
         Complaint(title='Stray dogs near parking', category='Other', description='There are aggressive stray dogs near the student parking lot causing issues.', priority='Medium', location='Student Parking Lot', status='Pending', user_id=student2.id, date_posted=now - timedelta(days=4))
     ]
-    
     db.session.add_all(complaints)
     db.session.commit()
     print("Seeded 10 dummy complaints.")
+    return True
+
+
+# --- Synthetic data ---------------------------------------------------------
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _cumulative(weights):
+    total, cum = 0.0, []
+    for weight in weights:
+        total += weight
+        cum.append(total)
+    return cum
+
+
+def _zipf_counts(rng, n, target, exponent, cap=None):
+    """Split ``target`` over ``n`` items by a Zipf curve on a random ranking."""
+    if n == 0 or target <= 0:
+        return [0] * n
+    weights = [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+    scale = target / sum(weights)
+    ranking = list(range(n))
+    rng.shuffle(ranking)
+    counts = [0] * n
+    for index, weight in zip(ranking, weights):
+        raw = weight * scale
+        count = int(raw) + (rng.random() < raw - int(raw))
+        counts[index] = min(count, cap) if cap is not None else count
+    return counts
+
+
+class _BatchWriter:
+    """Buffers row dicts and flushes them with one ``executemany`` per batch."""
+
+    def __init__(self, conn, table, batch_size):
+        self.conn, self.statement, self.batch_size = conn, insert(table), batch_size
+        self.rows, self.written = [], 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.conn.execute(self.statement, self.rows)
+            self.written += len(self.rows)
+            self.rows = []
+
+
+def _generate_users(conn, count, password, batch_size):
+    first_id = _next_id(User)
+    staff_count = min(count, max(2, count // 200))
+    writer = _BatchWriter(conn, User.__table__, batch_size)
+    for user_id in range(first_id, first_id + count):
+        role = 'staff' if user_id - first_id < staff_count else 'student'
+        username = f'{role}{user_id}'
+        writer.add({'id': user_id, 'username': username, 'email': f'{username}.load@asmedu.org',
+                    'password': password, 'role': role})
+    writer.flush()
+    return writer.written
+
+
+def _pick_status(rng, age_days):
+    for max_age, weights in STATUS_BY_AGE:
+        if max_age is None or age_days < max_age:
+            return rng.choices(list(weights), list(weights.values()))[0]
+
+
+def _generate_complaints(conn, rng, count, students, staff, now, days, upvote_counts, batch_size):
+    """Insert ``count`` complaints; returns ``[(id, posted, assignee), ...]``."""
+    first_id = _next_id(Complaint)
+    categories, category_cum = list(CATEGORY_WEIGHTS), _cumulative(CATEGORY_WEIGHTS.values())
+    priorities, priority_cum = list(PRIORITY_WEIGHTS), _cumulative(PRIORITY_WEIGHTS.values())
+    # Mild Zipf over authors: a few students file most complaints
+    author_cum = _cumulative(1.0 / (rank ** 0.6) for rank in range(1, len(students) + 1))
+    authors = students[:]
+    rng.shuffle(authors)
+
+    span = days * 86400
+    created = []
+    writer = _BatchWriter(conn, Complaint.__table__, batch_size)
+    for offset in range(count):
+        complaint_id = first_id + offset
+        category = rng.choices(categories, cum_weights=category_cum)[0]
+        age = span * rng.random() ** 2  # Squared: most complaints are recent
+        posted = now - timedelta(seconds=age)
+        status = _pick_status(rng, age / 86400)
+        assignee = rng.choice(staff) if status != 'Pending' and staff else None
+        resolved = posted + timedelta(seconds=rng.uniform(3600, max(3600, min(age, 14 * 86400)))) \
+            if status == 'Resolved' else None
+        issue, location = rng.choice(ISSUES[category]), rng.choice(LOCATIONS)
+        writer.add({
+            'id': complaint_id,
+            'title': f'{issue} ({location})',
+            'category': category,
+            'description': f'{issue} at {location}. Reported by several students; '
+                           f'please look into it as soon as possible.',
+            'priority': rng.choices(priorities, cum_weights=priority_cum)[0],
+            'location': location,
+            'image_file': None,
+            'date_posted': posted,
+            'date_resolved': resolved,
+            'status': status,
+            'updated_at': resolved or posted,
+            'user_id': rng.choices(authors, cum_weights=author_cum)[0],
+            'assigned_to': assignee,
+            'is_deleted': rng.random() < 0.01,
+            'upvote_count': upvote_counts[offset],
+        })
+        created.append((complaint_id, posted, assignee))
+    writer.flush()
+    return created
+
+
+def _generate_upvotes(conn, rng, complaints, voters, counts, now, batch_size):
+    writer = _BatchWriter(conn, Upvote.__table__, batch_size)
+    for (complaint_id, posted, _), count in zip(complaints, counts):
+        if not count:
+            continue
+        window = (now - posted).total_seconds()
+        for user_id in rng.sample(voters, count):
+            writer.add({'user_id': user_id, 'complaint_id': complaint_id,
+                        'created_at': posted + timedelta(seconds=window * rng.random())})
+    writer.flush()
+    return writer.written
+
+
+def _generate_comments(conn, rng, complaints, students, counts, now, batch_size):
+    writer = _BatchWriter(conn, Comment.__table__, batch_size)
+    for (complaint_id, posted, assignee), count in zip(complaints, counts):
+        window = (now - posted).total_seconds()
+        for _ in range(count):
+            author = assignee if assignee and rng.random() < 0.2 else rng.choice(students)
+            writer.add({'complaint_id': complaint_id, 'author_id': author, 'body': rng.choice(COMMENTS),
+                        'created_at': posted + timedelta(seconds=window * rng.random())})
+    writer.flush()
+    return writer.written
+
+
+def generate_dataset(users=0, complaints=0, upvotes=0, comments=0, seed=42, days=365,
+                     batch_size=5000, now=None):
+    """Append a synthetic dataset; returns the number of rows written per table.
+
+    Complaints, upvotes and comments are spread over every student and
+    staff account in the database, including ones created by earlier runs.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    written = {'users': 0, 'complaints': 0, 'upvotes': 0, 'comments': 0}
+
+    if users:
+        password = hash_password('student123')  # One hash shared by every generated account
+        with db.engine.begin() as conn:
+            written['users'] = _generate_users(conn, users, password, batch_size)
+
+    if complaints:
+        students = list(db.session.execute(select(User.id).filter_by(role='student').order_by(User.id)).scalars())
+        staff = list(db.session.execute(select(User.id).filter_by(role='staff').order_by(User.id)).scalars())
+        if not students:
+            raise ValueError('Generating complaints needs at least one student account.')
+        upvote_counts = _zipf_counts(rng, complaints, upvotes, 0.8, cap=len(students) // 2)
+        comment_counts = _zipf_counts(rng, complaints, comments, 0.7)
+
+        with search_index_suspended(), rollups_suspended():
+            with db.engine.begin() as conn:
+                created = _generate_complaints(conn, rng, complaints, students, staff, now, days,
+                                               upvote_counts, batch_size)
+        written['complaints'] = len(created)
+        with db.engine.begin() as conn:
+            written['upvotes'] = _generate_upvotes(conn, rng, created, students, upvote_counts, now, batch_size)
+        with db.engine.begin() as conn:
+            written['comments'] = _generate_comments(conn, rng, created, students, comment_counts, now,
+                                                     batch_size)
+
+    # Core inserts bypass the session events that normally invalidate caches
+    db.session.expire_all()
+    bump_data_version()
+    invalidate_dashboard_stats()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=0, help='synthetic accounts to add (0.5%% staff)')
+    parser.add_argument('--complaints', type=int, default=0, help='synthetic complaints to add')
+    parser.add_argument('--upvotes', type=int, default=0, help='upvotes spread over the new complaints')
+    parser.add_argument('--comments', type=int, default=0, help='comments spread over the new complaints')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: 42)')
+    parser.add_argument('--days', type=int, default=365, help='history window in days (default: 365)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per executemany (default: 5000)')
+    parser.add_argument('--no-demo', action='store_true', help='skip the demo accounts and complaints')
+    args = parser.parse_args(argv)
+
+    # Ensure instance folder exists
+    os.makedirs(os.path.join(BASE_DIR, 'instance'), exist_ok=True)
+    os.makedirs(os.path.join(BASE_DIR, 'uploads'), exist_ok=True)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print("Database tables created.")
+        if not args.no_demo:
+            seed_demo()
+        if args.users or args.complaints:
+            started = time.perf_counter()
+            written = generate_dataset(args.users, args.complaints, args.upvotes, args.comments,
+                                       seed=args.seed, days=args.days, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+            print("Generated " + ", ".join(f"{count} {table}" for table, count in written.items())
+                  + f" in {elapsed:.1f}s.")
+    shutdown_executor()
     print("Database seeding completed successfully.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import pytest
+from app import create_app, db
+from app.models import User
+from config import TestConfig
+
+@pytest.fixture
+def app():
+    # The engine is bound in create_app, so the test database has to be
+    # chosen through the config class rather than patched in afterwards.
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()  # Use create_all for in-memory testing
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    def _make_user(username, role='student'):
+        user = User(username=username, email=f'{username}@asmedu.org', password='hashed', role=role)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+@pytest.fixture
+def login(client):
+    def _login(user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+    return _login
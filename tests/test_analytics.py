@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from app import db
+from app.analytics import compute_dashboard_stats, get_dashboard_stats
+from app.models import Complaint
+
+def _complaint(author, **kwargs):
+    complaint = Complaint(title='Issue', category=kwargs.pop('category', 'Other'), description='Details',
+                          location='Campus', author=author, **kwargs)
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+def test_dashboard_stats_aggregates(app, make_user):
+    alice = make_user('alice')
+    now = datetime.utcnow()
+    _complaint(alice, category='Hostel')
+    _complaint(alice, category='Hostel', status='In Progress')
+    _complaint(alice, status='Resolved', date_posted=now - timedelta(days=10), date_resolved=now - timedelta(days=2))
+    _complaint(alice, status='Resolved', date_posted=now - timedelta(days=30), date_resolved=now - timedelta(days=26, hours=12))
+    _complaint(alice, is_deleted=True)
+
+    stats = compute_dashboard_stats(now)
+    assert stats['total_complaints'] == 4
+    assert stats['status_counts'] == {'Pending': 1, 'In Progress': 1, 'Resolved': 2, 'Escalated': 0}
+    assert stats['category_counts'] == {'Hostel': 2, 'Other': 2}
+    assert stats['resolved_this_week'] == 1
+    assert stats['resolution_days'] == {'avg': 5.5, 'min': 3, 'max': 8}
+
+def test_dashboard_stats_cache_invalidated_on_state_change(app, make_user):
+    alice = make_user('alice')
+    complaint = _complaint(alice)
+    assert get_dashboard_stats()['status_counts']['Pending'] == 1
+
+    # Non-tracked edits keep the cached figures
+    cached = get_dashboard_stats()
+    complaint.title = 'Renamed'
+    db.session.commit()
+    assert get_dashboard_stats() is cached
+
+    complaint.status = 'Resolved'
+    complaint.date_resolved = datetime.utcnow()
+    db.session.commit()
+    stats = get_dashboard_stats()
+    assert stats is not cached
+    assert stats['status_counts'] == {'Pending': 0, 'In Progress': 0, 'Resolved': 1, 'Escalated': 0}
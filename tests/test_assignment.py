@@ -0,0 +1,59 @@
+from app import db
+from app.assignment import auto_assign, least_loaded
+from app.models import Complaint, ComplaintHistory
+
+def _submit(client, category='Hostel'):
+    client.post('/complaint/new', data={'title': 'Issue', 'category': category, 'priority': 'Medium',
+                                        'location': 'Block A', 'description': 'Details'})
+    return Complaint.query.order_by(Complaint.id.desc()).first()
+
+def _complaint(author, **kwargs):
+    complaint = Complaint(title='Issue', category='Hostel', description='Details', location='Block A',
+                          author=author, **kwargs)
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+def test_least_loaded_counts_open_live_complaints(app, make_user):
+    alice = make_user('alice')
+    busy, idle = make_user('busy', role='staff'), make_user('idle', role='staff')
+    _complaint(alice, assigned_to=busy.id)
+    _complaint(alice, assigned_to=idle.id, status='Resolved')
+    _complaint(alice, assigned_to=idle.id, is_deleted=True)
+    assert tuple(least_loaded()) == (idle.id, 'idle', 0)
+    assert tuple(least_loaded(['busy'])) == (busy.id, 'busy', 1)
+    assert least_loaded(['nobody']) is None
+
+def test_submission_goes_to_least_loaded_staff(app, client, make_user, login):
+    app.config['AUTO_ASSIGN_ENABLED'] = True
+    alice = make_user('alice')
+    busy, idle = make_user('busy', role='staff'), make_user('idle', role='staff')
+    _complaint(alice, assigned_to=busy.id, status='In Progress')
+    login(alice)
+
+    first = _submit(client)
+    assert (first.assigned_to, first.status) == (idle.id, 'Pending')
+    assert ComplaintHistory.query.filter_by(complaint_id=first.id).one().notes == 'Auto-assigned to idle (0 open).'
+    # Both now have one open complaint; ties go to the lower id
+    assert _submit(client).assigned_to == busy.id
+    # Still Pending, so the student can edit it
+    assert client.get(f'/complaint/{first.id}/edit').status_code == 200
+
+def test_category_pools_fall_back_to_all_staff(app, client, make_user, login):
+    app.config['AUTO_ASSIGN_ENABLED'] = True
+    alice = make_user('alice')
+    librarian, other = make_user('librarian', role='staff'), make_user('other', role='staff')
+    app.config['ASSIGNMENT_POOLS'] = {'Library': ['librarian', 'retired'], 'Canteen': ['retired']}
+    _complaint(alice, assigned_to=librarian.id, status='In Progress')
+    login(alice)
+
+    assert _submit(client, 'Library').assigned_to == librarian.id
+    assert _submit(client, 'Canteen').assigned_to == other.id
+
+def test_auto_assign_disabled_or_without_staff(app, make_user):
+    alice = make_user('alice')
+    complaint = _complaint(alice)
+    assert auto_assign(complaint) is None
+    app.config['AUTO_ASSIGN_ENABLED'] = True
+    assert auto_assign(complaint) is None
+    assert complaint.assigned_to is None
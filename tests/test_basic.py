@@ -1,22 +1,6 @@
-import pytest
-from app import create_app, db
+from app import db
 from app.models import User, Complaint
 
-@pytest.fixture
-def app():
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    app.config['WTF_CSRF_ENABLED'] = False  # Disable CSRF for testing
-    with app.app_context():
-        db.create_all()  # Use create_all for in-memory testing
-        yield app
-        db.drop_all()
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
 def test_register_valid_email(app):
     with app.app_context():
         from app.auth import validate_email_domain
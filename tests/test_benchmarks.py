@@ -0,0 +1,41 @@
+from benchmarks.routes import compare, run
+from config import Config
+
+
+def _result(statements=3, rows=10, p50=5.0, p95=8.0, dataset=None, calibration=None):
+    return {'dataset': dataset or {'complaints': 10}, 'calibration_ms': calibration,
+            'routes': {'student.feed': {'statements': statements, 'rows': rows, 'p50_ms': p50, 'p95_ms': p95}}}
+
+
+def test_compare_within_tolerance():
+    assert compare(_result(), _result(rows=11, p50=9.0, p95=13.0)) == []
+
+
+def test_compare_flags_each_kind_of_regression():
+    problems = compare(_result(), _result(statements=4, rows=12, p95=20.0))
+    assert len(problems) == 3
+    assert 'SQL statements' in problems[0] and 'rows fetched' in problems[1] and 'p95_ms' in problems[2]
+
+
+def test_compare_scales_latency_by_calibration():
+    baseline = _result(calibration=50.0)
+    # Host three times slower: 3x the latency is not a regression, but is without calibration
+    assert compare(baseline, _result(p50=15.0, p95=24.0, calibration=150.0)) == []
+    assert len(compare(baseline, _result(p50=15.0, p95=24.0))) == 2
+
+
+def test_compare_latency_gate_can_be_disabled():
+    assert compare(_result(), _result(p95=100.0), latency_gate=False) == []
+
+
+def test_compare_rejects_other_dataset():
+    assert 'does not match' in compare(_result(), _result(dataset={'complaints': 20}))[0]
+
+
+def test_routes_run_on_small_dataset():
+    result = run({'users': 40, 'complaints': 200, 'upvotes': 400, 'comments': 200}, requests=2, warmup=1)
+    assert set(result['routes']) == {'student.feed', 'student.dashboard', 'admin.dashboard', 'staff.dashboard',
+                                     'student.view_complaint', 'student.upvote', 'student.post_comment'}
+    assert result['calibration_ms'] > 0
+    for name, budget in Config.QUERY_BUDGETS.items():
+        assert result['routes'][name]['statements'] <= budget
@@ -0,0 +1,73 @@
+from app import db
+from app.models import Complaint, ComplaintHistory
+
+def _complaints(author, n, **kwargs):
+    complaints = [Complaint(title=f'Issue {i}', category='Other', description='d', location='l', author=author,
+                            **kwargs) for i in range(n)]
+    db.session.add_all(complaints)
+    db.session.commit()
+    return [c.id for c in complaints]
+
+def _bulk(client, **data):
+    return client.post('/admin/bulk', data=data, headers={'Accept': 'application/json'})
+
+def test_bulk_assign_reports_per_id_outcomes(client, make_user, login):
+    admin, staff, alice = make_user('admin', 'admin'), make_user('it', 'staff'), make_user('alice')
+    ids = _complaints(alice, 3)
+    db.session.get(Complaint, ids[2]).is_deleted = True
+    db.session.commit()
+    login(admin)
+
+    response = _bulk(client, action='assign', staff_id=staff.id, ids=[ids[0], ids[1], ids[2], 999, 'x'])
+    assert response.get_json() == {'action': 'assign', 'updated': 2, 'results': [
+        {'id': 'x', 'outcome': 'invalid_id'},
+        {'id': ids[0], 'outcome': 'updated'},
+        {'id': ids[1], 'outcome': 'updated'},
+        {'id': ids[2], 'outcome': 'deleted'},
+        {'id': 999, 'outcome': 'not_found'},
+    ]}
+    db.session.expire_all()
+    assert [(c.assigned_to, c.status) for c in Complaint.query.filter(Complaint.id.in_(ids[:2]))] == \
+        [(staff.id, 'In Progress')] * 2
+    history = ComplaintHistory.query.filter_by(complaint_id=ids[0]).one()
+    assert (history.old_status, history.new_status, history.changed_by) == ('Pending', 'In Progress', admin.id)
+
+    # Repeating the assignment changes nothing
+    assert _bulk(client, action='assign', staff_id=staff.id, ids=ids[:2]).get_json()['updated'] == 0
+
+def test_bulk_status_and_delete(client, make_user, login):
+    admin, alice = make_user('admin', 'admin'), make_user('alice')
+    ids = _complaints(alice, 2)
+    login(admin)
+
+    assert _bulk(client, action='status', status='Resolved', ids=ids).get_json()['updated'] == 2
+    db.session.expire_all()
+    assert all(c.status == 'Resolved' and c.date_resolved for c in Complaint.query)
+
+    assert _bulk(client, action='delete', ids=ids).status_code == 400  # Not confirmed
+    assert _bulk(client, action='delete', confirm='yes', ids=ids).get_json()['updated'] == 2
+    db.session.expire_all()
+    assert Complaint.query.filter_by(is_deleted=False).count() == 0
+
+def test_bulk_reopen_clears_resolution_time(client, make_user, login):
+    admin, alice = make_user('admin', 'admin'), make_user('alice')
+    ids = _complaints(alice, 2)
+    login(admin)
+
+    _bulk(client, action='status', status='Resolved', ids=ids)
+    db.session.expire_all()
+    assert all(c.date_resolved is not None for c in Complaint.query)
+    _bulk(client, action='status', status='In Progress', ids=ids[:1])
+    db.session.expire_all()
+    assert [c.date_resolved is None for c in Complaint.query.order_by(Complaint.id)] == [True, False]
+
+def test_bulk_rejects_invalid_requests(client, make_user, login):
+    admin, alice = make_user('admin', 'admin'), make_user('alice')
+    ids = _complaints(alice, 1)
+    login(admin)
+    assert _bulk(client, action='status', status='Closed', ids=ids).status_code == 400
+    assert _bulk(client, action='assign', staff_id=alice.id, ids=ids).status_code == 400
+
+    # Without JSON, the dashboard gets a flash and a redirect
+    response = client.post('/admin/bulk', data={'action': 'status', 'status': 'Resolved', 'ids': ids})
+    assert response.status_code == 302
@@ -0,0 +1,55 @@
+from flask import g
+from app import db
+from app.cache import DataVersion, DiskBackend, MemoryBackend
+from app.models import Complaint, User
+
+def _page(client, login, user_id, url='/feed'):
+    g.pop('_login_user', None)
+    db.session.remove()
+    login(db.session.get(User, user_id))
+    return client.get(url).get_data(as_text=True)
+
+def test_data_version_shared_through_file(tmp_path):
+    path = str(tmp_path / 'version')
+    worker_a, worker_b = DataVersion(path), DataVersion(path)
+    assert worker_a.current() == 0
+    worker_a.bump()
+    worker_a.bump()
+    assert worker_b.current() == 2
+    assert worker_b.bump() == 3
+
+def test_backends_bound_their_size(tmp_path):
+    memory = MemoryBackend(max_entries=2)
+    for key in 'abc':
+        memory.set(key, key.upper())
+    assert memory.get('a') is None and memory.get('c') == 'C'
+
+    disk = DiskBackend(str(tmp_path / 'pages'), max_entries=2)
+    disk.set('a', {'rows': [1, 2]})
+    assert DiskBackend(str(tmp_path / 'pages')).get('a') == {'rows': [1, 2]}
+    disk.set('b', 'B')
+    disk.set('c', 'C')
+    assert len(list((tmp_path / 'pages').glob('*.pickle'))) == 2
+
+def test_feed_cached_until_data_changes(app, client, login, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    db.session.add(Complaint(title='Broken fan', category='Hostel', description='d', location='l', user_id=alice.id))
+    db.session.commit()
+    alice_id, bob_id = alice.id, bob.id
+    cache = app.extensions['page_cache']
+
+    assert 'Broken fan' in _page(client, login, alice_id)
+    _page(client, login, bob_id)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Upvoting bumps the data version; the highlight stays per-user
+    version = cache.version.current()
+    client.post('/upvote/1')
+    assert cache.version.current() > version
+    assert 'btn btn-primary" style="padding: 4px 10px' in _page(client, login, bob_id)
+    assert 'btn btn-primary" style="padding: 4px 10px' not in _page(client, login, alice_id)
+    assert cache.stats()['hit_ratio'] == 0.5
+
+    db.session.get(Complaint, 1).title = 'Broken ceiling fan'
+    db.session.commit()
+    assert 'Broken ceiling fan' in _page(client, login, alice_id)
@@ -0,0 +1,34 @@
+from app import create_app, db
+from app.database import current_pragmas, sqlite_maintenance
+from app.models import User
+from config import Config, TestConfig
+
+def _file_app(tmp_path, **overrides):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'profile.db')
+        SQLALCHEMY_ENGINE_OPTIONS = Config.SQLALCHEMY_ENGINE_OPTIONS
+    for key, value in overrides.items():
+        setattr(FileConfig, key, value)
+    return create_app(FileConfig)
+
+def test_production_profile_pragmas(tmp_path):
+    app = _file_app(tmp_path)
+    with app.app_context():
+        pragmas = current_pragmas()
+        assert pragmas == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+                           'cache_size': -32000, 'mmap_size': 256 * 1024 * 1024, 'temp_store': 2}
+        assert db.engine.pool.size() == Config.SQLALCHEMY_ENGINE_OPTIONS['pool_size']
+
+        db.create_all()
+        db.session.add(User(username='alice', email='alice@asmedu.org', password='x'))
+        db.session.commit()
+        report = sqlite_maintenance()
+        assert report['busy'] == 0 and report['wal_pages'] == report['checkpointed']
+        db.session.remove()
+        db.engine.dispose()
+
+def test_profile_can_be_disabled(tmp_path):
+    app = _file_app(tmp_path, SQLITE_PRAGMAS={})
+    with app.app_context():
+        assert current_pragmas()['journal_mode'] == 'delete'
+        db.engine.dispose()
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from app import db
+from app.commands import export_complaints_command
+from app.models import Complaint
+
+def _seed(make_user):
+    alice, staff = make_user('alice'), make_user('it', 'staff')
+    db.session.add_all([
+        Complaint(title='No Wi-Fi, again', category='Wi-Fi / Internet', description='Down since "Monday"',
+                  location='Library', author=alice, assignee=staff, status='In Progress'),
+        Complaint(title='Cold food', category='Canteen', description='d', location='Canteen', author=alice),
+        Complaint(title='Hidden', category='Canteen', description='d', location='x', author=alice, is_deleted=True),
+    ])
+    db.session.commit()
+
+def test_csv_export_streams_filtered_rows(app, client, make_user, login):
+    _seed(make_user)
+    login(make_user('admin', 'admin'))
+    response = client.get('/admin/export.csv')
+    assert response.is_streamed and response.mimetype == 'text/csv'
+    assert 'attachment; filename="complaints-' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r['title'], r['student'], r['assigned_to']) for r in rows] == \
+        [('No Wi-Fi, again', 'alice', 'it'), ('Cold food', 'alice', '')]
+    assert rows[0]['description'] == 'Down since "Monday"'
+
+    filtered = client.get('/admin/export.csv?category=Canteen').get_data(as_text=True)
+    assert [r['title'] for r in csv.DictReader(io.StringIO(filtered))] == ['Cold food']
+    assert client.get('/admin/export.xml').status_code == 404
+
+def test_ndjson_export_in_small_chunks(app, client, make_user, login):
+    _seed(make_user)
+    app.config['EXPORT_CHUNK_SIZE'] = 1
+    login(make_user('admin', 'admin'))
+    response = client.get('/admin/export.ndjson?status=In%20Progress')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(r['id'], r['assigned_to'], r['date_resolved']) for r in records] == [(1, 'it', None)]
+
+def test_export_command(app, make_user, tmp_path):
+    _seed(make_user)
+    path = tmp_path / 'out.ndjson'
+    result = app.test_cli_runner().invoke(export_complaints_command, ['--format', 'ndjson', '-o', str(path)])
+    assert result.exit_code == 0, result.output
+    assert len(path.read_text().splitlines()) == 2
@@ -0,0 +1,64 @@
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from flask import render_template_string
+from app import db
+from app.fragments import FragmentCache, fragment_key
+from app.models import Complaint
+from app.uploads import variant_path
+
+TEMPLATE = "{% cache 'card', complaint %}<h4>{{ complaint.title }}</h4>{% endcache %}<b>{{ viewer }}</b>"
+
+def test_fragment_key_uses_updated_at():
+    stamp = datetime(2026, 3, 1, 9, 30)
+    assert fragment_key(['card', SimpleNamespace(id=7, updated_at=stamp)]) == 'card|7@2026-03-01T09:30:00'
+    assert fragment_key(['card', 3]) == 'card|3'
+
+def test_fragment_cache_is_bounded_by_size():
+    cache = FragmentCache(max_bytes=300)
+    for key in 'abcd':
+        cache.set(key, key * 100)
+    assert cache.get('a') is None and cache.get('d') == 'd' * 100
+    assert cache.stats()['bytes'] <= 300
+
+def test_cached_fragment_reused_until_complaint_changes(app, make_user):
+    app.config['FRAGMENT_CACHE_ENABLED'] = True
+    complaint = Complaint(title='Flickering light', category='Other', description='d', location='l',
+                          author=make_user('alice'))
+    db.session.add(complaint)
+    db.session.commit()
+
+    with app.test_request_context():
+        assert render_template_string(TEMPLATE, complaint=complaint, viewer='a') == \
+            '<h4>Flickering light</h4><b>a</b>'
+        # Bypass the ORM so updated_at stays put: the stale fragment is served
+        db.session.execute(db.text("UPDATE complaint SET title = 'Changed'"))
+        db.session.expire(complaint)
+        html = render_template_string(TEMPLATE, complaint=complaint, viewer='b')
+        assert html == '<h4>Flickering light</h4><b>b</b>'
+
+        complaint.title = 'Flickering hall light'
+        db.session.commit()
+        assert '<h4>Flickering hall light</h4>' in render_template_string(TEMPLATE, complaint=complaint, viewer='c')
+    assert app.extensions['fragment_cache'].stats()['hits'] == 1
+
+def test_feed_card_picks_up_thumbnail_once_generated(app, client, make_user, login, tmp_path):
+    app.config.update(FRAGMENT_CACHE_ENABLED=True, UPLOAD_FOLDER=str(tmp_path))
+    alice = make_user('alice')
+    db.session.add(Complaint(title='Cracked window', category='Other', description='d', location='l',
+                             author=alice, image_file='window.jpg'))
+    db.session.commit()
+    login(alice)
+
+    assert '/uploads/thumb/' not in client.get('/feed').get_data(as_text=True)
+    thumb = variant_path(str(tmp_path), 'window.jpg', 'thumb')
+    os.makedirs(os.path.dirname(thumb))
+    open(thumb, 'wb').close()
+    assert '/uploads/thumb/' in client.get('/feed').get_data(as_text=True)
+
+def test_disabled_cache_always_renders(app):
+    with app.test_request_context():
+        for title in ('One', 'Two'):
+            html = render_template_string(TEMPLATE, complaint=SimpleNamespace(id=1, updated_at=None, title=title),
+                                          viewer='x')
+            assert f'<h4>{title}</h4>' in html
@@ -0,0 +1,54 @@
+import time
+from app import db
+from app.identity import Identity, IdentityCache, invalidate_identity
+from app.models import load_user
+
+def _cache(app):
+    return app.extensions['identity_cache']
+
+def test_load_user_served_from_cache(app, make_user):
+    alice = make_user('alice', role='staff')
+    first = load_user(str(alice.id))
+    assert isinstance(first, Identity)
+    assert (first.id, first.username, first.role, first.email) == (alice.id, 'alice', 'staff', 'alice@asmedu.org')
+    assert first.is_authenticated and first.get_id() == str(alice.id)
+    assert load_user(str(alice.id)) is first
+    assert _cache(app).stats() == {'hits': 1, 'misses': 1, 'size': 1}
+    assert load_user('999') is None
+
+def test_identity_invalidated_when_user_changes(app, make_user):
+    alice = make_user('alice')
+    assert load_user(str(alice.id)).role == 'student'
+
+    alice.role = 'admin'
+    db.session.commit()
+    assert load_user(str(alice.id)).role == 'admin'
+
+    db.session.delete(alice)
+    db.session.commit()
+    assert load_user(str(alice.id)) is None
+
+def test_identity_cache_ttl_and_bound(monkeypatch):
+    cache = IdentityCache(maxsize=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.put(Identity(user_id, f'u{user_id}', 'student', f'u{user_id}@asmedu.org'))
+    assert cache.get(1) is None  # Evicted as least recently used
+    assert cache.get(3).username == 'u3'
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert cache.get(3) is None
+    assert cache.stats()['size'] == 1
+
+def test_role_change_applies_to_next_request(app, client, make_user, login):
+    from flask import g
+    alice = make_user('alice', role='admin')
+    login(alice)
+    assert client.get('/admin/dashboard').status_code == 200
+
+    # A bulk UPDATE bypasses the session events, so invalidate explicitly
+    db.session.query(type(alice)).filter_by(id=alice.id).update({'role': 'student'})
+    db.session.commit()
+    invalidate_identity(alice.id)
+    g.pop('_login_user', None)
+    assert client.get('/admin/dashboard').status_code == 302
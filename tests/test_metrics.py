@@ -0,0 +1,66 @@
+from prometheus_client import REGISTRY
+from app import create_app, db
+from app.metrics import TimedQueuePool, configure_pool_timing
+from app.tasks import Scheduler
+from config import Config, TestConfig
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_and_db_metrics(app, client, make_user, login):
+    login(make_user('alice'))
+    labels = {'endpoint': 'student.feed', 'method': 'GET', 'status': '200'}
+    before = _sample('campussync_requests_total', **labels)
+    statements_before = _sample('campussync_request_db_statements_sum', endpoint='student.feed')
+
+    assert client.get('/feed').status_code == 200
+    assert _sample('campussync_requests_total', **labels) == before + 1
+    assert _sample('campussync_request_db_statements_sum', endpoint='student.feed') > statements_before
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'campussync_request_duration_seconds_bucket{endpoint="student.feed"' in body
+    assert 'campussync_cache_lookups_total{cache="page_cache",result="miss"}' in body
+
+
+def test_unmatched_paths_share_one_label(client):
+    before = _sample('campussync_requests_total', endpoint='unmatched', method='GET', status='404')
+    client.get('/no/such/page')
+    assert _sample('campussync_requests_total', endpoint='unmatched', method='GET', status='404') == before + 1
+
+
+def test_metrics_token_required_when_set():
+    class TokenConfig(TestConfig):
+        METRICS_TOKEN = 'secret'
+    client = create_app(TokenConfig).test_client()
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_job_durations_recorded(app, tmp_path):
+    before = _sample('campussync_job_duration_seconds_count', job='metrics_job', outcome='failure')
+    scheduler = Scheduler(app, str(tmp_path / 'scheduler.lock'))
+    scheduler.add_job(lambda: 1 / 0, id='metrics_job', seconds=3600)
+    scheduler.run_pending()
+    scheduler.shutdown()
+    assert _sample('campussync_job_duration_seconds_count', job='metrics_job', outcome='failure') == before + 1
+
+
+def test_pooled_engines_use_timed_pool(tmp_path):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'metrics.db')
+        SCHEDULER_ENABLED = False
+        DATA_VERSION_FILE = None
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert isinstance(db.engine.pool, TimedQueuePool)
+        before = _sample('campussync_db_pool_wait_seconds_count')
+        with db.engine.connect():
+            pass
+        assert _sample('campussync_db_pool_wait_seconds_count') == before + 1
+        db.engine.dispose()
+
+    memory_app = create_app(TestConfig)
+    configure_pool_timing(memory_app)
+    assert 'poolclass' not in memory_app.config['SQLALCHEMY_ENGINE_OPTIONS']
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import Complaint
+from app.pagination import decode_cursor, encode_cursor, keyset_paginate
+from app.queries import MOST_UPVOTED, NEWEST_FIRST, live_complaints
+
+def _seed(author, n):
+    start = datetime(2026, 1, 1)
+    for i in range(n):
+        # Repeated timestamps and vote counts exercise the id tie-breaker
+        db.session.add(Complaint(title=f'Issue {i}', category='Other', description='Details', location='Campus',
+                                 author=author, upvote_count=i % 3, date_posted=start + timedelta(hours=i // 2)))
+    db.session.commit()
+
+def test_cursor_round_trip():
+    state = {'key': [3, datetime(2026, 1, 2, 3, 4, 5), 17], 'page': 2, 'total': 40}
+    assert decode_cursor(encode_cursor(state)) == state
+    assert decode_cursor('not-a-cursor!') is None
+    assert decode_cursor(None) is None
+
+def test_tampered_cursor_falls_back_to_first_page(client, make_user, login):
+    alice = make_user('alice')
+    _seed(alice, 3)
+    login(alice)
+    for state in ({'key': [1, 2], 'page': 'x'}, {'key': [[1], {'a': 1}], 'page': 2},
+                  {'key': [1, 2], 'page': 2, 'total': 'abc'}, {'key': [{'$dt': 5}, 2]}):
+        token = encode_cursor(state)
+        assert decode_cursor(token) is None
+        assert client.get(f'/feed?cursor={token}').status_code == 200
+
+def test_keyset_walks_forward_and_back(app, make_user):
+    _seed(make_user('alice'), 23)
+    expected = [c.id for c in live_complaints().order_by(
+        Complaint.upvote_count.desc(), Complaint.date_posted.desc(), Complaint.id.desc())]
+
+    pages, cursor = [], None
+    while True:
+        page = keyset_paginate(live_complaints(), MOST_UPVOTED, 5, cursor=cursor)
+        pages.append(page)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    assert [c.id for page in pages for c in page] == expected
+    assert [page.number for page in pages] == [1, 2, 3, 4, 5]
+    assert all(page.total == 23 and page.pages == 5 for page in pages)
+
+    back = keyset_paginate(live_complaints(), MOST_UPVOTED, 5, cursor=pages[3].prev_cursor)
+    assert [c.id for c in back] == [c.id for c in pages[2]]
+    assert back.number == 3 and back.has_next and back.has_prev
+
+def test_later_pages_skip_count(app, make_user):
+    _seed(make_user('alice'), 12)
+    first = keyset_paginate(live_complaints(), NEWEST_FIRST, 5)
+    db.session.add(Complaint(title='Late', category='Other', description='x', location='y', user_id=1,
+                             date_posted=datetime(2020, 1, 1)))
+    db.session.commit()
+    second = keyset_paginate(live_complaints(), NEWEST_FIRST, 5, cursor=first.next_cursor)
+    assert second.total == 12  # carried from page 1, not recounted
+
+def test_feed_next_link_preserves_filters(client, make_user, login):
+    alice = make_user('alice')
+    _seed(alice, 15)
+    login(alice)
+    html = client.get('/feed?category=Other').get_data(as_text=True)
+    assert 'category=Other' in html and 'cursor=' in html
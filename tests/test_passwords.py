@@ -0,0 +1,51 @@
+import pytest
+from app import db
+from app.models import User
+from app import passwords
+from app.passwords import PasswordServiceBusy, check_password, hash_password, hash_stats, needs_rehash
+
+def _user(app, password, rounds):
+    user = User(username='alice', email='alice@asmedu.org', password=passwords._hash(password, rounds))
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_hash_and_check(app):
+    hashed = hash_password('correct horse')
+    assert hashed.startswith('$2b$04$')
+    assert check_password(hashed, 'correct horse')
+    assert not check_password(hashed, 'wrong')
+    assert not check_password('not-a-hash', 'correct horse')
+    assert not needs_rehash(hashed)
+    assert hash_stats()['check']['count'] >= 3
+
+def test_login_rehashes_when_cost_changes(app, client):
+    user = _user(app, 'secret123', 5)
+    assert needs_rehash(user.password)
+    response = client.post('/auth/login', data={'email': 'alice@asmedu.org', 'password': 'secret123'})
+    assert response.status_code == 302
+    db.session.refresh(user)
+    assert user.password.startswith('$2b$04$')
+
+def test_login_busy_returns_503(app, client, monkeypatch):
+    _user(app, 'secret123', 4)
+    def busy(*args):
+        raise PasswordServiceBusy()
+    monkeypatch.setattr('app.auth.check_password', busy)
+    response = client.post('/auth/login', data={'email': 'alice@asmedu.org', 'password': 'secret123'})
+    assert response.status_code == 503
+    assert b'busy' in response.data
+
+def test_process_pool_rejects_when_saturated(app):
+    app.config.update(PASSWORD_HASH_SYNC=False, PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1)
+    try:
+        hashed = hash_password('pooled')
+        assert check_password(hashed, 'pooled')
+        _, slots = passwords._get_executor(app.config)
+        slots.acquire()  # Occupy the only slot
+        with pytest.raises(PasswordServiceBusy):
+            hash_password('rejected')
+        slots.release()
+        assert hash_stats()['hash']['rejected'] >= 1
+    finally:
+        passwords.shutdown_executor()
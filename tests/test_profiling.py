@@ -0,0 +1,77 @@
+import logging
+import pytest
+from app import create_app, db
+from app.models import User
+from app.profiling import _start_profile
+from config import TestConfig
+
+
+def _make_app(tmp_path, **overrides):
+    class ProfilingConfig(TestConfig):
+        PROFILING_DIR = str(tmp_path / 'profiles')
+    for name, value in overrides.items():
+        setattr(ProfilingConfig, name, value)
+    return create_app(ProfilingConfig)
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    def _profiled(**overrides):
+        app = _make_app(tmp_path, **overrides)
+        ctx = app.app_context()
+        ctx.push()
+        db.create_all()
+        admin = User(username='admin', email='admin@asmedu.org', password='x', role='admin')
+        student = User(username='alice', email='alice@asmedu.org', password='x', role='student')
+        db.session.add_all([admin, student])
+        db.session.commit()
+        contexts.append(ctx)
+        return app, admin.id, student.id
+    contexts = []
+    yield _profiled
+    for ctx in contexts:
+        db.session.remove()
+        db.drop_all()
+        ctx.pop()
+
+
+def _client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    return client
+
+
+def test_nothing_registered_by_default(profiled):
+    app, admin_id, _ = profiled()
+    assert _start_profile not in app.before_request_funcs.get(None, [])
+    response = _client(app, admin_id).get('/admin/dashboard', headers={'X-Profile': '1'})
+    assert 'Server-Timing' not in response.headers
+
+
+def test_admin_header_profiles_request_and_writes_capture(profiled, tmp_path):
+    app, admin_id, _ = profiled(PROFILING_HEADER='X-Profile')
+    response = _client(app, admin_id).get('/admin/dashboard', headers={'X-Profile': '1'})
+    assert response.status_code == 200
+    assert 'sql;dur=' in response.headers['Server-Timing']
+    captures = list((tmp_path / 'profiles').glob('*-admin.dashboard-*.prof'))
+    assert len(captures) == 1
+
+
+def test_header_ignored_for_non_admins(profiled, tmp_path):
+    app, _, student_id = profiled(PROFILING_HEADER='X-Profile')
+    response = _client(app, student_id).get('/feed', headers={'X-Profile': '1'})
+    assert 'Server-Timing' not in response.headers
+    assert not (tmp_path / 'profiles').exists()
+
+
+def test_slow_queries_logged_with_view(profiled, caplog):
+    app, _, student_id = profiled(PROFILING_ENABLED=True, PROFILING_SLOW_QUERY_MS=0,
+                                  PROFILING_SAMPLE_RATE=0)
+    with caplog.at_level(logging.INFO, logger='app.profiling'):
+        response = _client(app, student_id).get('/feed')
+    assert 'Server-Timing' in response.headers
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith('Slow query')]
+    assert slow and all('student.feed' in message for message in slow)
+    assert any('GET /feed -> 200' in r.getMessage() for r in caplog.records)
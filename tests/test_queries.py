@@ -0,0 +1,41 @@
+import pytest
+from flask import g
+from app import db
+from app.models import Comment, Complaint, User
+
+@pytest.fixture
+def populated(make_user):
+    admin = make_user('admin', role='admin')
+    staff = make_user('staff', role='staff')
+    students = [make_user(f'student{i}') for i in range(10)]
+    for i, student in enumerate(students):
+        db.session.add(Complaint(title=f'Issue {i}', category='Hostel', description='Details',
+                                 location='Block A', user_id=student.id, assigned_to=staff.id))
+    db.session.commit()
+    for student in students:
+        db.session.add(Comment(complaint_id=1, author_id=student.id, body='Same here'))
+    db.session.commit()
+    return {'admin': admin.id, 'staff': staff.id, 'student': students[0].id}
+
+def _get(client, login, user_id, url):
+    # Start each request from an empty identity map, as a real worker would
+    g.pop('_login_user', None)
+    db.session.remove()
+    login(db.session.get(User, user_id))
+    db.session.remove()
+    return client.get(url)
+
+@pytest.mark.parametrize('role, url', [
+    ('admin', '/admin/dashboard'),
+    ('staff', '/staff/dashboard'),
+    ('student', '/feed'),
+    ('student', '/dashboard'),
+    ('student', '/complaint/1'),
+])
+def test_list_views_stay_within_query_budget(client, login, populated, role, url):
+    assert _get(client, login, populated[role], url).status_code == 200
+
+def test_query_budget_violation_fails(app, client, login, populated):
+    app.config['QUERY_BUDGETS'] = dict(app.config['QUERY_BUDGETS'], **{'admin.dashboard': 1})
+    with pytest.raises(AssertionError, match='admin.dashboard issued'):
+        _get(client, login, populated['admin'], '/admin/dashboard')
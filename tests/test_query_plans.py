@@ -0,0 +1,66 @@
+import re
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Comment, Complaint, User
+
+@pytest.fixture
+def captured(app):
+    statements = []
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', _capture)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', _capture)
+
+@pytest.fixture
+def users(make_user):
+    users = {role: make_user(role, role=role) for role in ('admin', 'staff', 'student')}
+    for i in range(30):
+        db.session.add(Complaint(title=f'Issue {i}', category='Hostel', description='Details', location='Block A',
+                                 user_id=users['student'].id, assigned_to=users['staff'].id))
+    db.session.commit()
+    db.session.add(Comment(complaint_id=1, author_id=users['student'].id, body='Still broken'))
+    db.session.commit()
+    return {role: user.id for role, user in users.items()}
+
+def _plans(statements):
+    """EXPLAIN QUERY PLAN every captured SELECT; yields (sql, [plan details])."""
+    conn = db.session.connection()
+    for statement, parameters in statements:
+        if statement.lstrip().upper().startswith('SELECT'):
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+            yield statement, [row[3] for row in rows]
+
+def _next_url(html):
+    match = re.search(r'href="([^"]*cursor=[^"]*)"', html)
+    return match.group(1).replace('&amp;', '&') if match else None
+
+@pytest.mark.parametrize('role, url, sorted_by_index', [
+    ('admin', '/admin/dashboard', True),
+    ('admin', '/admin/dashboard?status=Pending', True),
+    ('admin', '/admin/dashboard?category=Hostel', True),
+    ('staff', '/staff/dashboard', False),
+    ('staff', '/staff/dashboard?tab=resolved', True),
+    ('student', '/feed', True),
+    ('student', '/feed?status=Pending', True),
+    ('student', '/feed?category=Hostel', True),
+    ('student', '/dashboard', True),
+    ('student', '/dashboard?sort=oldest', True),
+    ('student', '/dashboard?sort=upvoted', False),
+    ('student', '/complaint/1', True),
+])
+def test_list_views_use_indexes(client, login, users, captured, role, url, sorted_by_index):
+    login(db.session.get(User, users[role]))
+    html = client.get(url).get_data(as_text=True)
+    next_url = _next_url(html)
+    if next_url:
+        # Check the keyset seek of a deeper page as well as the first page
+        client.get(next_url)
+
+    for statement, plan in _plans(captured):
+        for step in plan:
+            assert not (step.startswith('SCAN ') and 'USING' not in step and 'VIRTUAL TABLE' not in step), \
+                f'{url}: full table scan in {step!r} for {statement}'
+            if sorted_by_index and 'count(' not in statement:
+                assert 'TEMP B-TREE' not in step, f'{url}: sort step {step!r} for {statement}'
@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, text, update
+from app import db
+from app.commands import rebuild_rollups_command
+from app.models import Complaint, ComplaintDailyStat
+from app.analytics import compute_dashboard_stats
+from app.rollups import daily_trends, dashboard_rollups, ensure_rollups, rebuild_rollups
+
+TODAY = date(2026, 3, 10)
+
+def _complaint(author, days_ago, category='Other', **kwargs):
+    complaint = Complaint(title='Issue', category=category, description='Details', location='Campus',
+                          author=author, date_posted=datetime(2026, 3, 10, 9) - timedelta(days=days_ago), **kwargs)
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+def _snapshot():
+    stat = ComplaintDailyStat
+    return sorted(tuple(row) for row in db.session.execute(
+        select(stat.dimension, stat.key, stat.day, stat.created, stat.resolved, stat.backlog_delta)
+        .where((stat.created != 0) | (stat.resolved != 0) | (stat.backlog_delta != 0))))
+
+def test_triggers_match_rebuild(app, make_user):
+    alice = make_user('alice')
+    staff = make_user('sam', role='staff')
+    first = _complaint(alice, 5, category='Library')
+    second = _complaint(alice, 3, category='Hostel', assigned_to=staff.id)
+    third = _complaint(alice, 1)
+
+    first.status, first.date_resolved, first.assigned_to = 'Resolved', datetime(2026, 3, 9, 12), staff.id
+    second.category = 'Canteen'
+    db.session.commit()
+    db.session.execute(update(Complaint).where(Complaint.id == third.id).values(priority='High'))
+    db.session.commit()
+    second.is_deleted = True
+    db.session.commit()
+    db.session.delete(third)
+    db.session.commit()
+
+    incremental = _snapshot()
+    rebuild_rollups()
+    assert _snapshot() == incremental
+    assert ('staff', str(staff.id), date(2026, 3, 9), 0, 1, -1) in incremental
+
+def test_dashboard_rollups_trend(app, make_user):
+    alice = make_user('alice')
+    _complaint(alice, 200, category='Library')  # Before the window: opening backlog only
+    _complaint(alice, 2, category='Library', status='Resolved', date_resolved=datetime(2026, 3, 9, 10))
+    _complaint(alice, 0, category='Hostel')
+
+    rollups = dashboard_rollups(days=3, today=TODAY)
+    assert rollups['trend'] == {'labels': ['2026-03-08', '2026-03-09', '2026-03-10'],
+                                'created': [1, 0, 1], 'resolved': [0, 1, 0], 'backlog': [2, 1, 2]}
+    assert rollups['category_counts'] == {'Library': 2, 'Hostel': 1}
+
+def test_daily_trends_ranks_keys_by_backlog(app, make_user):
+    alice = make_user('alice')
+    _complaint(alice, 1, category='Library')
+    _complaint(alice, 1, category='Hostel')
+    _complaint(alice, 0, category='Hostel')
+
+    trends = daily_trends('category', days=2, limit=1, today=TODAY)
+    assert trends['labels'] == ['2026-03-09', '2026-03-10']
+    assert trends['series'] == {'Hostel': {'created': [1, 1], 'resolved': [0, 0], 'backlog': [1, 2]}}
+
+def test_trends_endpoint(client, make_user, login):
+    staff = make_user('sam', role='staff')
+    _complaint(make_user('alice'), 0, assigned_to=staff.id)
+    login(make_user('root', role='admin'))
+
+    data = client.get('/admin/trends?dimension=staff&days=7').get_json()
+    assert len(data['labels']) == 7
+    assert data['series']['sam']['backlog'][-1] == 1
+    assert client.get('/admin/trends?dimension=location').status_code == 400
+    assert b'trendChart' in client.get('/admin/dashboard').data
+
+def test_rebuild_rollups_command(app, make_user):
+    _complaint(make_user('alice'), 0)
+    db.session.execute(ComplaintDailyStat.__table__.delete())
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(rebuild_rollups_command)
+    assert result.exit_code == 0
+    assert dashboard_rollups(days=1, today=TODAY)['trend']['created'] == [1]
+
+def test_ensure_rollups_backfills_upgraded_database(app, make_user):
+    _complaint(make_user('alice'), 0, category='Library')
+    # As after the migration: an empty table and no triggers yet
+    for trigger in ('ai', 'ad', 'au'):
+        db.session.execute(text(f'DROP TRIGGER complaint_rollup_{trigger}'))
+    db.session.execute(ComplaintDailyStat.__table__.delete())
+    db.session.commit()
+
+    assert ensure_rollups() is True
+    assert compute_dashboard_stats()['category_counts'] == {'Library': 1}
+    assert ensure_rollups() is False
@@ -0,0 +1,85 @@
+import pytest
+from flask import g
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models import Complaint, User
+from app.routing import read_only, read_uri
+from config import Config, TestConfig
+
+def test_read_uri():
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'sqlite:////srv/app.db'}) == 'sqlite:///file:/srv/app.db?mode=ro&uri=true'
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) is None
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'postgresql://db/app'}) is None
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'postgresql://db/app',
+                     'SQLALCHEMY_READ_URI': 'postgresql://replica/app'}) == 'postgresql://replica/app'
+
+@pytest.fixture
+def file_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'routing.db')
+        SQLALCHEMY_ENGINE_OPTIONS = Config.SQLALCHEMY_ENGINE_OPTIONS
+    app = create_app(FileConfig)
+
+    @app.route('/_probe/read')
+    @read_only
+    def probe_read():
+        url = str(db.session.get_bind().url)
+        try:
+            db.session.execute(text("UPDATE user SET role = 'admin'"))
+        except OperationalError as e:
+            return f'{url}|{e.orig}'
+        return f'{url}|written'
+
+    @app.route('/_probe/write')
+    def probe_write():
+        return str(db.session.get_bind().url)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        app.extensions['read_engine'].dispose()
+
+def test_read_only_views_use_read_engine(file_app):
+    client = file_app.test_client()
+    url, outcome = client.get('/_probe/read').get_data(as_text=True).split('|')
+    assert 'mode=ro' in url
+    assert 'readonly' in outcome
+    assert 'mode=ro' not in client.get('/_probe/write').get_data(as_text=True)
+
+def test_feed_reads_committed_rows_through_read_engine(file_app):
+    alice = User(username='alice', email='alice@asmedu.org', password='x')
+    db.session.add(alice)
+    db.session.flush()
+    db.session.add(Complaint(title='Leaking tap', category='Other', description='d', location='l', user_id=alice.id))
+    db.session.commit()
+
+    client = file_app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(alice.id)
+    g.pop('_login_user', None)
+    response = client.get('/feed')
+    assert response.status_code == 200
+    assert b'Leaking tap' in response.data
+    assert not g.get('db_read_only')
+
+def test_export_streams_from_read_engine(file_app):
+    admin = User(username='root', email='root@asmedu.org', password='x', role='admin')
+    db.session.add(admin)
+    db.session.flush()
+    db.session.add(Complaint(title='Leaking tap', category='Other', description='d', location='l', user_id=admin.id))
+    db.session.commit()
+
+    statements = []
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(file_app.extensions['read_engine'], 'before_cursor_execute', _capture)
+
+    client = file_app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin.id)
+    g.pop('_login_user', None)
+    assert 'Leaking tap' in client.get('/admin/export.csv').get_data(as_text=True)
+    assert any('FROM complaint' in statement for statement in statements)
@@ -0,0 +1,42 @@
+from app import db
+from app.models import Complaint
+from app.search import build_match_expression, rebuild_search_index
+
+def _complaint(author, title, description='Details', location='Campus', category='Other', **kwargs):
+    complaint = Complaint(title=title, category=category, description=description,
+                          location=location, author=author, **kwargs)
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+def test_match_expression_quotes_prefix_terms():
+    assert build_match_expression('wifi lib') == '"wifi"* "lib"*'
+    assert build_match_expression('OR "NEAR(') == '"OR"* "NEAR"*'
+    assert build_match_expression('  ') == ''
+
+def test_feed_search_uses_index_and_ranks(client, make_user, login):
+    alice = make_user('alice')
+    library = _complaint(alice, 'Library wifi drops', location='Main Library')
+    body_only = _complaint(alice, 'Slow network', description='Happens near the library too')
+    _complaint(alice, 'Broken chair')
+    login(alice)
+
+    html = client.get('/feed?search=libr').get_data(as_text=True)
+    assert 'Broken chair' not in html
+    assert html.index(f'/upvote/{library.id}') < html.index(f'/upvote/{body_only.id}')
+
+def test_search_index_follows_edits_and_filters(client, make_user, login):
+    alice = make_user('alice')
+    complaint = _complaint(alice, 'Projector flickers', category='Classrooms')
+    login(alice)
+
+    complaint.title = 'Speaker crackles'
+    db.session.commit()
+    assert 'Speaker crackles' not in client.get('/feed?search=projector').get_data(as_text=True)
+    assert 'Speaker crackles' in client.get('/feed?search=speaker&category=Classrooms').get_data(as_text=True)
+    assert 'Speaker crackles' not in client.get('/feed?search=speaker&category=Hostel').get_data(as_text=True)
+
+def test_rebuild_search_index(app, make_user):
+    alice = make_user('alice')
+    _complaint(alice, 'Leaking tap')
+    assert rebuild_search_index() == 1
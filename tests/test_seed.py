@@ -0,0 +1,58 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from app import db
+from app.models import Comment, Complaint, Upvote, User
+from app.search import apply_search
+from seed_db import generate_dataset, seed_demo
+
+NOW = datetime(2026, 1, 15, 12, 0)
+
+
+def _snapshot():
+    return db.session.execute(
+        select(Complaint.id, Complaint.category, Complaint.status, Complaint.user_id,
+               Complaint.assigned_to, Complaint.upvote_count).order_by(Complaint.id)
+    ).all()
+
+
+def test_generate_dataset_counts_and_consistency(app):
+    written = generate_dataset(users=60, complaints=200, upvotes=600, comments=300, seed=7, now=NOW)
+
+    assert written['users'] == 60 and written['complaints'] == 200
+    # Synthetic staff pass the assignment filters (admin dropdown, auto-assignment)
+    assert db.session.scalar(select(func.count(User.id)).filter_by(role='staff')
+                             .where(User.email.endswith('@asmedu.org'))) == 2
+    assert db.session.scalar(select(func.count(Upvote.id))) == written['upvotes'] > 0
+    assert db.session.scalar(select(func.count(Comment.id))) == written['comments'] > 0
+    # Stored counters agree with the upvote rows
+    actual = select(func.count(Upvote.id)).where(Upvote.complaint_id == Complaint.id).scalar_subquery()
+    assert db.session.scalar(select(func.count(Complaint.id)).where(Complaint.upvote_count != actual)) == 0
+    # Pending complaints are unassigned, everything is posted before "now"
+    assert db.session.scalar(select(func.count(Complaint.id)).where(
+        Complaint.status == 'Pending', Complaint.assigned_to.isnot(None))) == 0
+    assert db.session.scalar(select(func.max(Complaint.date_posted))) <= NOW
+
+
+def test_generate_dataset_is_reproducible(app):
+    generate_dataset(users=30, complaints=50, upvotes=100, comments=40, seed=3, now=NOW)
+    first = _snapshot()
+
+    db.drop_all()
+    db.create_all()
+    generate_dataset(users=30, complaints=50, upvotes=100, comments=40, seed=3, now=NOW)
+    assert _snapshot() == first
+
+
+def test_generated_complaints_are_searchable(app):
+    generate_dataset(users=10, complaints=20, seed=1, now=NOW)
+    query, _ = apply_search(db.session.query(Complaint), 'reported')
+    assert query.count() == 20
+
+
+def test_seeding_can_be_rerun(app):
+    assert seed_demo() is True
+    assert seed_demo() is False
+    generate_dataset(users=5, complaints=5, seed=1, now=NOW)
+    generate_dataset(users=5, complaints=5, seed=1, now=NOW)
+    assert db.session.scalar(select(func.count(User.id))) == 15
+    assert db.session.scalar(select(func.count(Complaint.id))) == 20
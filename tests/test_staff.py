@@ -0,0 +1,47 @@
+import re
+from datetime import datetime, timedelta
+from app import db
+from app.models import Complaint
+
+def test_staff_tabs_order_and_counts(client, make_user, login):
+    staff = make_user('fixer', role='staff')
+    student = make_user('alice')
+    start = datetime(2026, 3, 1)
+    rows = [
+        ('Old low', 'Low', 'Pending', 0),
+        ('New high', 'High', 'In Progress', 5),
+        ('Old high', 'High', 'In Progress', 1),
+        ('Medium', 'Medium', 'Pending', 2),
+        ('Done', 'High', 'Resolved', 3),
+    ]
+    for title, priority, status, age in rows:
+        db.session.add(Complaint(title=title, category='Other', description='x', location='y', priority=priority,
+                                 status=status, user_id=student.id, assigned_to=staff.id,
+                                 date_posted=start + timedelta(days=age)))
+    db.session.commit()
+    login(staff)
+
+    html = client.get('/staff/dashboard').get_data(as_text=True)
+    titles = re.findall(r'<h4[^>]*>([^<]+)</h4>', html)
+    assert titles == ['Old high', 'New high', 'Medium', 'Old low']
+    assert 'Open (4)' in html and 'Resolved (1)' in html
+    assert 'In Progress: 2' in html and 'Pending: 2' in html
+
+    html = client.get('/staff/dashboard?tab=resolved').get_data(as_text=True)
+    assert re.findall(r'<h4[^>]*>([^<]+)</h4>', html) == ['Done']
+
+def test_staff_open_tab_paginates(client, make_user, login):
+    staff = make_user('fixer', role='staff')
+    student = make_user('alice')
+    for i in range(15):
+        db.session.add(Complaint(title=f'Task {i}', category='Other', description='x', location='y',
+                                 priority=('High', 'Low')[i % 2], user_id=student.id, assigned_to=staff.id))
+    db.session.commit()
+    login(staff)
+
+    first = client.get('/staff/dashboard').get_data(as_text=True)
+    next_url = re.search(r'href="([^"]*cursor=[^"]*)"', first).group(1).replace('&amp;', '&')
+    second = client.get(next_url).get_data(as_text=True)
+    seen = re.findall(r'<h4[^>]*>([^<]+)</h4>', first) + re.findall(r'<h4[^>]*>([^<]+)</h4>', second)
+    assert sorted(seen) == sorted(f'Task {i}' for i in range(15))
+    assert 'Page 2 of 2' in second
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from app import db
+from app.models import Complaint, ComplaintHistory
+from app.tasks import Scheduler, auto_escalate_complaints, job_context
+
+def _complaint(author, priority, hours_old, status='Pending', now=None, **kwargs):
+    complaint = Complaint(title=f'{priority} {hours_old}h', category='Other', description='x', location='y',
+                          priority=priority, status=status, author=author,
+                          date_posted=now - timedelta(hours=hours_old), **kwargs)
+    db.session.add(complaint)
+    return complaint
+
+def test_escalation_uses_priority_thresholds_and_is_idempotent(app, make_user):
+    app.config['ESCALATION_CHUNK_SIZE'] = 2
+    alice = make_user('alice')
+    now = datetime(2026, 5, 1, 12, 0)
+    overdue = [
+        _complaint(alice, 'High', 50, now=now),
+        _complaint(alice, 'High', 49, status='In Progress', now=now),
+        _complaint(alice, 'Medium', 80, now=now),
+        _complaint(alice, 'Low', 130, now=now),
+        _complaint(alice, 'Urgent', 73, now=now),
+    ]
+    untouched = [
+        _complaint(alice, 'High', 40, now=now),
+        _complaint(alice, 'Low', 100, now=now),
+        _complaint(alice, 'High', 90, status='Resolved', now=now),
+        _complaint(alice, 'High', 90, now=now, is_deleted=True),
+    ]
+    db.session.commit()
+
+    report = auto_escalate_complaints(app, now=now)
+    assert report['escalated'] == 5
+    assert report['chunks'] == 4  # One per priority pass with matches
+    db.session.expire_all()
+    assert all(c.status == 'Escalated' for c in overdue)
+    assert [c.status for c in untouched] == ['Pending', 'Pending', 'Resolved', 'Pending']
+
+    history = ComplaintHistory.query.filter_by(complaint_id=overdue[1].id).one()
+    assert (history.old_status, history.new_status, history.changed_by) == ('In Progress', 'Escalated', None)
+    assert 'High priority open > 48h' in history.notes
+
+    assert auto_escalate_complaints(app, now=now)['escalated'] == 0
+    assert ComplaintHistory.query.count() == 5
+
+def test_scheduler_runs_jobs_in_a_single_leader(app, tmp_path):
+    lock_path = str(tmp_path / 'scheduler.lock')
+    calls = []
+    leader = Scheduler(app, lock_path)
+    follower = Scheduler(app, lock_path)
+    for scheduler in (leader, follower):
+        scheduler.add_job(lambda: calls.append(1), id='job', seconds=3600)
+
+    # flock is per open file description, so a second Scheduler in this
+    # process stands in for another gunicorn worker.
+    assert leader.run_pending() == ['job']
+    assert follower.run_pending() == []
+    assert leader.run_pending() == []  # Not due again yet
+    leader.shutdown()
+    assert follower.run_pending() == ['job']
+    follower.shutdown()
+    assert calls == [1, 1]
+
+def test_failed_job_rolls_back_its_own_session(app, tmp_path):
+    rolled_back = []
+    def failing_job():
+        with job_context(app):
+            session = db.session()
+            event.listen(session, 'after_rollback', lambda s: rolled_back.append(s))
+            db.session.execute(text("UPDATE user SET role = 'admin'"))
+            raise RuntimeError('boom')
+
+    scheduler = Scheduler(app, str(tmp_path / 'scheduler.lock'))
+    scheduler.add_job(failing_job, id='failing', seconds=3600)
+    assert scheduler.run_pending() == ['failing']
+    scheduler.shutdown()
+    assert len(rolled_back) == 1
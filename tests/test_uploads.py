@@ -0,0 +1,120 @@
+import io
+import os
+import pytest
+from PIL import Image
+from app import db
+from app.models import Complaint
+from app.uploads import sweep_orphans, variant_path
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    return tmp_path
+
+def _png(size=(2000, 1000), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def _post(client, data, name='photo.png'):
+    form = {'title': 'Leak', 'category': 'Hostel', 'priority': 'Low', 'location': 'Block B',
+            'description': 'Water everywhere', 'image': (io.BytesIO(data), name)}
+    return client.post('/complaint/new', data=form, content_type='multipart/form-data')
+
+def test_upload_is_content_addressed_with_variants(client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    data = _png()
+    _post(client, data)
+    _post(client, data, name='same-photo-again.png')
+
+    first, second = Complaint.query.order_by(Complaint.id).all()
+    assert first.image_file == second.image_file
+    assert first.image_file.endswith('.png') and len(first.image_file) == 64 + 4
+    assert sorted(p.name for p in upload_dir.iterdir() if p.is_file()) == [first.image_file]
+
+    with Image.open(variant_path(str(upload_dir), first.image_file, 'thumb')) as thumb:
+        assert max(thumb.size) == 320 and thumb.format == 'JPEG'
+    with Image.open(variant_path(str(upload_dir), first.image_file, 'web')) as web:
+        assert max(web.size) == 1280
+
+    html = client.get('/feed').get_data(as_text=True)
+    assert f'/uploads/thumb/{first.image_file}' in html
+    assert client.get(f'/uploads/thumb/{first.image_file}').status_code == 200
+
+def test_fake_and_oversized_images_are_rejected(app, client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    _post(client, b'<?php echo "not an image"; ?>', name='evil.png')
+    assert b'not a valid image' in client.get('/dashboard').data
+    assert Complaint.query.one().image_file is None
+
+    app.config['UPLOAD_MAX_BYTES'] = 1024
+    _post(client, _png(size=(400, 400)) + os.urandom(4096))
+    assert Complaint.query.order_by(Complaint.id.desc()).first().image_file is None
+    assert not [p for p in upload_dir.iterdir() if p.is_file()]
+
+def test_sweep_removes_unreferenced_files(client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    _post(client, _png(color=(1, 2, 3)))
+    complaint = Complaint.query.one()
+    kept = complaint.image_file
+
+    # Re-uploading on edit orphans the previous image
+    client.post(f'/complaint/{complaint.id}/edit', data={
+        'title': 'Leak', 'category': 'Hostel', 'priority': 'Low', 'location': 'Block B',
+        'description': 'Still leaking', 'image': (io.BytesIO(_png(color=(9, 9, 9))), 'new.png'),
+    }, content_type='multipart/form-data')
+    db.session.refresh(complaint)
+    assert complaint.image_file != kept
+
+    assert sweep_orphans(grace_seconds=3600) == []  # Too recent to sweep
+    removed = sweep_orphans(grace_seconds=-1)
+    assert sorted(os.path.basename(p) for p in removed) == sorted(
+        [kept, os.path.basename(variant_path('', kept, 'thumb')), os.path.basename(variant_path('', kept, 'web'))])
+    assert os.path.exists(os.path.join(upload_dir, complaint.image_file))
+
+def test_uploads_are_cacheable_and_conditional(app, client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    _post(client, _png(size=(50, 50)))
+    name = Complaint.query.one().image_file
+    url = f'/uploads/{name}'
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{name}"'
+    cache_control = response.headers['Cache-Control']
+    assert 'immutable' in cache_control and 'private' in cache_control and 'max-age=31536000' in cache_control
+
+    assert client.get(url, headers={'If-None-Match': f'"{name}"'}).status_code == 304
+
+    partial = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206 and len(partial.data) == 10
+
+def test_uploads_can_be_offloaded_to_nginx(app, client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    _post(client, _png(size=(50, 50)))
+    name = Complaint.query.one().image_file
+    app.config['UPLOAD_SENDFILE_MODE'] = 'x-accel'
+
+    response = client.get(f'/uploads/thumb/{name}')
+    stem = name.split('.')[0]
+    assert response.headers['X-Accel-Redirect'] == f'/protected-uploads/variants/{stem}.thumb.jpg'
+    assert response.data == b''
+    assert 'immutable' in response.headers['Cache-Control']
+
+def test_uploads_still_require_login(client, upload_dir):
+    assert client.get('/uploads/anything.png').status_code == 302
+
+def test_rejected_reupload_keeps_existing_image(client, make_user, login, upload_dir):
+    login(make_user('alice'))
+    _post(client, _png())
+    complaint = Complaint.query.one()
+    original = complaint.image_file
+
+    form = {'title': 'Leak (worse)', 'category': 'Hostel', 'priority': 'High', 'location': 'Block B',
+            'description': 'Water everywhere', 'image': (io.BytesIO(b'not an image'), 'notes.txt')}
+    response = client.post(f'/complaint/{complaint.id}/edit', data=form, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert 'Only PNG and JPEG images are allowed.' in response.get_data(as_text=True)
+
+    db.session.expire_all()
+    assert (complaint.image_file, complaint.title) == (original, 'Leak')
@@ -0,0 +1,80 @@
+from app import db
+from app.commands import repair_upvote_counts
+from app.models import Complaint, Upvote
+
+def _complaint(author, **kwargs):
+    complaint = Complaint(title='Broken fan', category='Classrooms', description='Fan in room 2 is broken',
+                          location='Room 2', author=author, **kwargs)
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+def test_upvote_toggle_maintains_counter(client, make_user, login):
+    alice = make_user('alice')
+    complaint = _complaint(alice)
+    login(alice)
+    stamp = complaint.updated_at
+
+    client.post(f'/upvote/{complaint.id}')
+    db.session.refresh(complaint)
+    assert complaint.upvote_count == 1
+    assert Upvote.query.count() == 1
+    assert complaint.updated_at == stamp  # Votes keep cached card fragments valid
+
+    client.post(f'/upvote/{complaint.id}')
+    db.session.refresh(complaint)
+    assert complaint.upvote_count == 0
+    assert Upvote.query.count() == 0
+
+def test_feed_ranks_by_upvote_count(client, make_user, login):
+    alice = make_user('alice')
+    quiet = _complaint(alice, upvote_count=0)
+    popular = _complaint(alice, upvote_count=5)
+    login(alice)
+
+    html = client.get('/feed').get_data(as_text=True)
+    assert html.index(f'/upvote/{popular.id}') < html.index(f'/upvote/{quiet.id}')
+
+def test_repair_upvote_counts(app, make_user):
+    alice = make_user('alice')
+    bob = make_user('bob')
+    complaint = _complaint(alice, upvote_count=7)
+    db.session.add_all([Upvote(user_id=alice.id, complaint_id=complaint.id),
+                        Upvote(user_id=bob.id, complaint_id=complaint.id)])
+    db.session.commit()
+
+    assert repair_upvote_counts() == 1
+    db.session.refresh(complaint)
+    assert complaint.upvote_count == 2
+    assert repair_upvote_counts() == 0
+
+def test_upvote_json_toggles_atomically(client, make_user, login):
+    alice = make_user('alice')
+    complaint = _complaint(alice, upvote_count=3)  # Drifted counter is adjusted, not recomputed
+    login(alice)
+
+    assert client.post(f'/api/complaint/{complaint.id}/upvote').get_json() == \
+        {'complaint_id': complaint.id, 'upvoted': True, 'upvote_count': 4}
+    assert client.post(f'/api/complaint/{complaint.id}/upvote').get_json()['upvoted'] is False
+    assert Upvote.query.count() == 0
+
+    complaint.is_deleted = True
+    db.session.commit()
+    assert client.post(f'/api/complaint/{complaint.id}/upvote').status_code == 404
+    assert client.post('/api/complaint/999/upvote').status_code == 404
+    assert Upvote.query.count() == 0
+
+def test_comment_json_returns_new_comment(client, make_user, login):
+    from app.models import Comment
+    alice = make_user('alice')
+    complaint = _complaint(alice)
+    login(alice)
+
+    response = client.post(f'/api/complaint/{complaint.id}/comments', data={'body': 'Still broken'})
+    assert response.status_code == 201
+    data = response.get_json()
+    assert (data['body'], data['author'], data['role']) == ('Still broken', 'alice', 'student')
+    assert db.session.get(Comment, data['id']).complaint_id == complaint.id
+
+    assert client.post(f'/api/complaint/{complaint.id}/comments', data={'body': '  '}).status_code == 400
+    assert client.post('/api/complaint/999/comments', data={'body': 'Hi'}).status_code == 404